@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+# -*- coding: latin-1 -*-
+
+""" Micro-benchmark of attribute access on PelotonWorkout, comparing the
+    descriptor based lazy loading against the __getattribute__ override we
+    used to have (which ran on every single attribute access)
+
+Usage: python -m benchmarks.bench_attribute_access [workouts] [rounds]
+"""
+
+import sys
+import timeit
+
+from peloton.peloton import NotLoaded
+from peloton.peloton import PelotonWorkout
+
+from benchmarks.mock_server import make_workout
+
+
+class LegacyPelotonWorkout:
+    """ A workout the way PelotonWorkout used to be: a plain object whose
+        attributes live in its __dict__, with every attribute access routed
+        through the old __getattribute__ lazy loading check
+    """
+
+    def __init__(self, **kwargs):
+
+        # Parse the raw data the same way, but keep the results as plain
+        # instance attributes (no slots, no descriptors)
+        workout = PelotonWorkout(**kwargs)
+        for attr in workout._field_names():
+            self.__dict__[attr] = workout._raw_value(attr)
+
+    def __getattribute__(self, attr):
+
+        value = object.__getattribute__(self, attr)
+
+        if attr in ['leaderboard_rank', 'leaderboard_users',
+                    'achievements', 'metrics'] and type(value) is NotLoaded:
+            raise AssertionError("Benchmark should never lazy load")
+
+        return value
+
+
+def touch(workouts):
+    for workout in workouts:
+        workout.id
+        workout.created_at
+        workout.fitness_discipline
+        workout.status
+
+
+def touch_lazy(workouts):
+    for workout in workouts:
+        workout.ride
+        workout.personal_record
+
+
+def main(total_workouts=10000, rounds=20):
+
+    data = [make_workout(i, total_workouts) for i in range(total_workouts)]
+    results = {}
+
+    for cls in (LegacyPelotonWorkout, PelotonWorkout):
+        workouts = [cls(**workout) for workout in data]
+
+        for name, func in (("plain", touch), ("lazy (loaded)", touch_lazy)):
+            elapsed = min(timeit.repeat(
+                lambda: func(workouts), number=1, repeat=rounds))
+            accesses = total_workouts * (4 if func is touch else 2)
+            results[cls, name] = elapsed
+            print("{:<22} {:<14} {:>7.1f} ns/access".format(
+                cls.__name__, name, elapsed / accesses * 1e9))
+
+    for name in ("plain", "lazy (loaded)"):
+        print("{:<14} speedup: {:.1f}x".format(
+            name, results[LegacyPelotonWorkout, name] /
+            results[PelotonWorkout, name]))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
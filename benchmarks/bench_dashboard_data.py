@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+# -*- coding: latin-1 -*-
+
+""" Time the dashboard's data preparation (dashboard_data.py) on a synthetic
+    table of raw workouts
+
+Usage: python -m benchmarks.bench_dashboard_data [--workouts N]
+                                                 [--max-seconds S]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy
+import pandas as pd
+
+from dashboard_data import prepare
+from dashboard_data import rollups_from_workouts
+
+
+DISCIPLINES = ['cycling', 'running', 'walking', 'strength', 'yoga',
+               'stretching', 'cardio', 'bootcamp']
+LENGTHS = [5, 10, 15, 20, 30, 45, 60, 75, 90]
+INSTRUCTORS = ['Instructor %d' % i for i in range(40)]
+
+
+def make_workouts(total_workouts, seed=0):
+    """ A frame shaped like the workouts table, spread over ten years
+    """
+
+    random = numpy.random.default_rng(seed)
+    start, end = pd.Timestamp('2015-01-01').value, pd.Timestamp('2025-01-01').value
+    created_at = pd.to_datetime(
+        numpy.sort(random.integers(start, end, total_workouts)))
+    fitness_discipline = random.choice(DISCIPLINES, total_workouts)
+    distance_miles = numpy.where(
+        numpy.isin(fitness_discipline, ['cycling', 'running', 'walking']),
+        random.uniform(1, 20, total_workouts), 0)
+
+    return pd.DataFrame({
+        'workoutid': ['%032x' % i for i in range(total_workouts)],
+        'fitness_discipline': fitness_discipline,
+        'created_at': created_at,
+        'calories': random.uniform(20, 900, total_workouts),
+        'instructorname': random.choice(INSTRUCTORS, total_workouts),
+        'durationseconds': random.choice(LENGTHS, total_workouts) * 60.0,
+        'distance_miles': distance_miles,
+    })
+
+
+def best_of(repeat, func, *args):
+    """ Return (result, fastest time) of calling func(*args) repeat times
+    """
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workouts", type=int, default=100000,
+                        help="size of the synthetic table")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float,
+                        help="fail if preparing everything takes longer")
+    args = parser.parse_args()
+
+    df = make_workouts(args.workouts)
+
+    rollups, rollup_time = best_of(args.repeat, rollups_from_workouts, df)
+    data, prepare_time = best_of(args.repeat, prepare, *rollups)
+
+    assert data.total_workouts == args.workouts
+
+    print("{} workouts, {} days: rollups {:.1f}ms, prepare {:.1f}ms, "
+          "total {:.1f}ms".format(args.workouts, len(data.calories_by_day),
+                                  rollup_time * 1000, prepare_time * 1000,
+                                  (rollup_time + prepare_time) * 1000))
+
+    if args.max_seconds and rollup_time + prepare_time > args.max_seconds:
+        sys.exit("Preparing the dashboard took {:.3f}s, more than {}s".format(
+            rollup_time + prepare_time, args.max_seconds))
+
+
+if __name__ == "__main__":
+    main()
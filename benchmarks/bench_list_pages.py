@@ -0,0 +1,44 @@
+#! /usr/bin/env python3
+# -*- coding: latin-1 -*-
+
+""" Compare sequential and concurrent page fetching in
+    PelotonWorkoutFactory.list() against a local mock server
+
+Usage: python -m benchmarks.bench_list_pages [workouts] [latency]
+"""
+
+import sys
+import time
+
+from peloton import PelotonAPI
+from peloton import PelotonWorkoutFactory
+
+from benchmarks.mock_server import MockPelotonServer
+from benchmarks.mock_server import point_client_at
+
+
+def main(total_workouts=2000, latency=0.02):
+
+    with MockPelotonServer(total_workouts, latency) as server:
+        point_client_at(server)
+
+        # Log in ahead of time so that we only time the listing itself
+        PelotonAPI.default()._create_api_session()
+
+        baseline = None
+        for max_workers in (1, 2, 4, 8, 16):
+            start = time.perf_counter()
+            workouts = PelotonWorkoutFactory.list(max_workers=max_workers)
+            elapsed = time.perf_counter() - start
+
+            assert len(workouts) == total_workouts
+            assert workouts[0].id > workouts[-1].id
+
+            baseline = baseline or elapsed
+            print("max_workers={:<3} {:>4} workouts in {:.3f}s "
+                  "({:.1f}x)".format(max_workers, len(workouts), elapsed,
+                                     baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main(*[float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]])
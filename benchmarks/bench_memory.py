@@ -0,0 +1,102 @@
+#! /usr/bin/env python3
+# -*- coding: latin-1 -*-
+
+""" Report how many bytes each PelotonWorkout (with its ride, instructor and
+    achievements) keeps resident, for a recorded workout history
+
+A fixture is a JSON list of raw workouts, as returned in the `data` of
+/api/user/<id>/workouts?joins=ride,ride.instructor. Record your own with
+--record (uses your configured credentials), or leave the fixture out to use
+a synthetic history from the mock server.
+
+Usage: python -m benchmarks.bench_memory [--record] [fixture.json]
+                                         [--max-bytes N]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+
+from peloton.peloton import PelotonAPI
+from peloton.peloton import PelotonWorkout
+from peloton.peloton import PelotonWorkoutFactory
+
+from benchmarks.mock_server import make_workout
+
+
+def record_fixture(path):
+    """ Save the logged in users full workout history to path
+    """
+
+    client = PelotonAPI.default()
+    client._create_api_session()
+    res = PelotonWorkoutFactory._workouts_page(0, 100, client)
+    data = res['data']
+    for page in range(1, res['page_count']):
+        data.extend(
+            PelotonWorkoutFactory._workouts_page(page, 100, client)['data'])
+
+    with open(path, 'w') as fixture:
+        json.dump(data, fixture)
+
+    return len(data)
+
+
+def measure(raw):
+    """ Return (workouts, retained bytes) for building PelotonWorkout
+        instances out of the raw (json encoded) history
+    """
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        data = json.loads(raw)
+        workouts = [PelotonWorkout(**workout) for workout in data]
+        del data
+        gc.collect()
+
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return len(workouts), size
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("fixture", nargs="?")
+    parser.add_argument("--record", action="store_true",
+                        help="record the fixture from the API first")
+    parser.add_argument("--workouts", type=int, default=5000,
+                        help="size of the synthetic history")
+    parser.add_argument("--max-bytes", type=int,
+                        help="fail if a workout takes more than this")
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.fixture:
+            parser.error("--record needs a fixture path")
+        print("Recorded {} workouts".format(record_fixture(args.fixture)))
+
+    if args.fixture:
+        with open(args.fixture) as fixture:
+            raw = fixture.read()
+    else:
+        raw = json.dumps([make_workout(i, args.workouts)
+                          for i in range(args.workouts)])
+
+    count, size = measure(raw)
+    per_workout = size / count
+    print("{} workouts, {:.1f} MiB resident, {:.0f} bytes per workout".format(
+        count, size / 1024 / 1024, per_workout))
+
+    if args.max_bytes and per_workout > args.max_bytes:
+        print("Over budget of {} bytes per workout".format(args.max_bytes))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#! /usr/bin/env python3
+# -*- coding: latin-1 -*-
+
+""" A tiny stand-in for api.onepeloton.com, used by the benchmarks in this
+    directory so that we can measure the client library without hammering
+    (or even talking to) Peloton
+
+    Every response is delayed by `latency` seconds to roughly mimic a
+    round trip to the real API
+"""
+
+import json
+import random
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+import peloton.peloton
+
+USER_ID = "benchmark-user"
+
+# A handful of instructors/rides, shared across workouts like they would
+# be for a real member
+INSTRUCTORS = [
+    {
+        "id": "instructor-{}".format(i),
+        "name": "Instructor {}".format(i),
+        "first_name": "Instructor",
+        "last_name": str(i),
+        "bio": "A long instructor bio. " * 40,
+        "music_bio": "A long music bio. " * 20,
+        "short_bio": "Short bio",
+        "quote": "Quote",
+        "background": "Background",
+        "spotify_playlist_uri": "spotify:playlist:{}".format(i),
+    } for i in range(8)
+]
+
+DISCIPLINES = ["cycling", "running", "strength", "yoga", "walking"]
+
+
+def make_workout(index, total, base_time=1590000000):
+    """ Build a (deterministic) workout as returned from the users
+        workout list, newest first
+    """
+
+    rng = random.Random(index)
+    created = base_time + (total - index) * 3600 * 14
+    duration = rng.choice([600, 1200, 1800, 2700])
+    ride_number = rng.randrange(200)
+    instructor = INSTRUCTORS[ride_number % len(INSTRUCTORS)]
+
+    return {
+        "id": "workout-{:06d}".format(total - index),
+        "created": created,
+        "created_at": created,
+        "start_time": created + 60,
+        "end_time": created + 60 + duration,
+        "fitness_discipline": DISCIPLINES[ride_number % len(DISCIPLINES)],
+        "status": "COMPLETE",
+        "metrics_type": "cycling",
+        "is_total_work_personal_record": False,
+        "ride": {
+            "id": "ride-{}".format(ride_number),
+            "title": "{} min Ride {}".format(duration // 60, ride_number),
+            "description": "A class description. " * 10,
+            "duration": duration,
+            "instructor": instructor,
+        },
+    }
+
+
+def make_performance_graph(workout_id, every_n=1, duration=1800):
+    """ Build a performance_graph payload with `duration / every_n` samples
+        per metric
+    """
+
+    rng = random.Random(workout_id)
+    samples = max(1, duration // every_n)
+    seconds = [i * every_n for i in range(samples)]
+
+    def series(slug, name, unit, low, high):
+        values = [round(rng.uniform(low, high), 2) for _ in seconds]
+        return {
+            "slug": slug,
+            "display_name": name,
+            "display_unit": unit,
+            "values": values,
+            "average_value": sum(values) / len(values),
+            "max_value": max(values),
+        }
+
+    return {
+        "duration": duration,
+        "seconds_since_pedaling_start": seconds,
+        "segment_list": [{"metrics_type": "cycling"}],
+        "summaries": [
+            {"slug": "total_output", "display_name": "Total Output",
+             "display_unit": "kj", "value": 300},
+            {"slug": "distance", "display_name": "Distance",
+             "display_unit": "mi", "value": 10.5},
+            {"slug": "calories", "display_name": "Calories",
+             "display_unit": "kcal", "value": 420},
+        ],
+        "metrics": [
+            series("output", "Output", "watts", 50, 300),
+            series("cadence", "Cadence", "rpm", 60, 110),
+            series("resistance", "Resistance", "%", 20, 60),
+            series("speed", "Speed", "mph", 10, 25),
+            series("heart_rate", "Heart Rate", "bpm", 90, 180),
+        ],
+    }
+
+
+class MockPelotonHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.count("/auth/login")
+
+        if urlparse(self.path).path != "/auth/login":
+            return self._send_json({"message": "not found"}, 404)
+
+        self._send_json({"user_id": USER_ID}, headers={
+            "Set-Cookie": "peloton_session_id=mock; Path=/"})
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip("/").split("/")
+        self.server.count(url.path)
+
+        # /api/user/<id>/workouts
+        if parts[:2] == ["api", "user"] and parts[3:] == ["workouts"]:
+            page = int(query.get("page", 0))
+            limit = int(query.get("limit", 10))
+            total = self.server.total_workouts
+            start = page * limit
+            data = [make_workout(i, total)
+                    for i in range(start, min(start + limit, total))]
+            return self._send_json({
+                "data": data,
+                "page": page,
+                "limit": limit,
+                "total": total,
+                "count": len(data),
+                "page_count": (total + limit - 1) // limit,
+            })
+
+        # /api/workout/<id>/performance_graph
+        if parts[:2] == ["api", "workout"] and parts[3:] == \
+                ["performance_graph"]:
+            every_n = int(query.get("every_n", 1))
+            return self._send_json(
+                make_performance_graph(parts[2], every_n))
+
+        # /api/workout/<id>
+        if parts[:2] == ["api", "workout"] and len(parts) == 3:
+            number = int(parts[2].rsplit("-", 1)[-1])
+            total = self.server.total_workouts
+            workout = make_workout(total - number, total)
+            workout.update({
+                "leaderboard_rank": 42,
+                "total_leaderboard_users": 1000,
+                "achievement_templates": [],
+            })
+            return self._send_json(workout)
+
+        self._send_json({"message": "not found"}, 404)
+
+
+class MockPelotonServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, total_workouts=500, latency=0.02):
+        super().__init__(("127.0.0.1", 0), MockPelotonHandler)
+        self.total_workouts = total_workouts
+        self.latency = latency
+        self.requests = {}
+        self._lock = threading.Lock()
+
+    def count(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    @property
+    def url(self):
+        return "http://{}:{}".format(*self.server_address)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def point_client_at(server):
+    """ Point the client library at a mock server, with throwaway
+        credentials that the mock will happily accept
+    """
+
+    peloton.peloton._BASE_URL = server.url
+    peloton.peloton.PelotonAPI.peloton_username = "benchmark"
+    peloton.peloton.PelotonAPI.peloton_password = "benchmark"
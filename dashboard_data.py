@@ -0,0 +1,101 @@
+from collections import namedtuple
+from datetime import date
+
+import pandas as pd
+
+
+'''
+Everything the dashboard shows, worked out from three rollups of the workouts:
+
+  by_day_discipline  Date, fitness_discipline, workouts, calories, distance_miles
+  by_day_length      Date, durationMinutes, workouts
+  by_instructor      instructorname, workouts
+
+These come straight out of the rollup tables that data_to_db.py maintains, or out of raw workouts (eg: from
+Parquet) with rollups_from_workouts(). Every step is a single vectorized groupby/pivot over the whole frame;
+nothing is done row by row, or once per fitness type.
+'''
+
+# Social distancing months
+CORONA_START = date(2020, 3, 1)
+CORONA_END = date(2020, 9, 1)
+
+DashboardData = namedtuple('DashboardData', [
+    'total_workouts',
+    'average_calories_per_day',
+    'average_calories_per_day_corona',
+    'average_miles_per_day_run',
+    'average_miles_per_day_cycling',
+    'calories_by_day',            # Series of calories, indexed by Date
+    'calories_by_day_discipline', # Date x fitness_discipline
+    'workouts_by_day',            # Series of workouts, indexed by Date
+    'workouts_by_day_discipline', # Date x fitness_discipline
+    'miles_by_day_discipline',    # Date x fitness_discipline, for those with any miles
+    'workouts_by_instructor',     # Series of workouts, most first
+    'workouts_by_length',         # "Length of Class (Minutes)", "Count of Classes" columns
+    'workouts_by_day_length',     # Date x durationMinutes (as strings)
+])
+
+
+def rollups_from_workouts(df):
+    """ The three rollups, out of raw workouts (columns as in the workouts table) """
+
+    df = pd.DataFrame({
+        'Date': df['created_at'].dt.normalize(),
+        'fitness_discipline': df['fitness_discipline'],
+        'calories': df['calories'],
+        'distance_miles': df['distance_miles'],
+        'durationMinutes': df['durationseconds'] / 60,
+        'instructorname': df['instructorname'],
+    })
+
+    by_day_discipline = (df.groupby(['Date', 'fitness_discipline'], as_index=False, sort=True)
+                           .agg(workouts=('fitness_discipline', 'size'), calories=('calories', 'sum'),
+                                distance_miles=('distance_miles', 'sum')))
+    by_day_length = df.groupby(['Date', 'durationMinutes'], as_index=False, sort=True).size().rename(columns={'size': 'workouts'})
+    by_instructor = df['instructorname'].value_counts().rename_axis('instructorname').reset_index(name='workouts')
+
+    return by_day_discipline, by_day_length, by_instructor
+
+
+def prepare(by_day_discipline, by_day_length, by_instructor):
+    """ Work out a DashboardData from the rollups """
+
+    by_day_discipline = by_day_discipline.assign(Date=pd.to_datetime(by_day_discipline['Date']))
+    by_day_length = by_day_length.assign(Date=pd.to_datetime(by_day_length['Date']),
+                                         durationMinutes=by_day_length['durationMinutes'].astype(float))
+
+    # Date x fitness_discipline. Missing (rather than zero) where there were no workouts
+    by_day = by_day_discipline.set_index(['Date', 'fitness_discipline']).astype(float).unstack('fitness_discipline')
+    calories = by_day.reindex(columns=['calories'], level=0).droplevel(0, axis=1)
+    workouts = by_day.reindex(columns=['workouts'], level=0).droplevel(0, axis=1)
+    miles = by_day.reindex(columns=['distance_miles'], level=0).droplevel(0, axis=1)
+
+    calories_by_day = calories.sum(axis=1)
+    corona = calories_by_day[(calories_by_day.index >= pd.Timestamp(CORONA_START)) &
+                             (calories_by_day.index < pd.Timestamp(CORONA_END))]
+
+    # Per day averages only count days with workouts of that type
+    run = miles.reindex(columns=['running', 'walking']).sum(axis=1, min_count=1)
+    cycling = miles.reindex(columns=['cycling']).sum(axis=1, min_count=1)
+
+    by_length = by_day_length.groupby('durationMinutes', as_index=False)['workouts'].sum()
+    by_day_length = by_day_length.pivot(index='Date', columns='durationMinutes', values='workouts')
+    by_day_length.columns = by_day_length.columns.map(str)
+
+    return DashboardData(
+        total_workouts=int(by_day_discipline['workouts'].sum()),
+        average_calories_per_day=calories_by_day.mean(),
+        average_calories_per_day_corona=corona.mean(),
+        average_miles_per_day_run=run.mean(),
+        average_miles_per_day_cycling=cycling.mean(),
+        calories_by_day=calories_by_day,
+        calories_by_day_discipline=calories,
+        workouts_by_day=workouts.sum(axis=1),
+        workouts_by_day_discipline=workouts,
+        miles_by_day_discipline=miles.where(miles != 0).dropna(axis=1, how='all'),
+        workouts_by_instructor=by_instructor.set_index('instructorname')['workouts'].sort_values(ascending=False),
+        workouts_by_length=by_length.rename(columns={'durationMinutes': 'Length of Class (Minutes)',
+                                                     'workouts': 'Count of Classes'}),
+        workouts_by_day_length=by_day_length,
+    )
@@ -1,117 +1,602 @@
+import argparse
+import io
+import queue
+import struct
+import threading
+import time
+
 import psycopg2
 from psycopg2 import Error
+from psycopg2.extras import execute_values
+
+from contextlib import contextmanager
 
 from peloton import PelotonWorkout
+from peloton.peloton import PelotonWorkoutMetricsFactory
+from workout_data import METRIC_COLUMNS
+from workout_data import metric_values
+from workout_data import workout_row
 import ipdb
 
-try:
-    connection = psycopg2.connect(user = "rivkahcarl",
-                 password = "",
-                 host = "127.0.0.1",
-                 port = "5432",
-                 database = "peloton")
-    cursor = connection.cursor()
-
-    create_basic_workout_table_query = '''
-                                        CREATE TABLE IF NOT EXISTS workouts 
-                                        (workoutId varchar PRIMARY KEY      NOT NULL
-                                         , fitness_discipline varchar       NOT NULL
-                                         , created_at   timestamp           NOT NULL
-                                         , calories decimal                 
-                                         , instructorName varchar
-                                         , durationSeconds decimal          NOT NULL
-                                         , distance_miles  decimal 
-                                        )
-                                        '''
-
-    cursor.execute(create_basic_workout_table_query)
-    connection.commit()
-    print("Peloton table created if not exists successfully")
 
-except(Exception, psycopg2.Error) as error:
-    print("Error while connecting to Postgresql", error)
-finally:
-    # closing database connection
-        if(connection):
-            cursor.close()
-            connection.close()
-            print("Postgresql connection is closed")
-
-
-try:
-    connection = psycopg2.connect(user = "rivkahcarl",
-                                    password = "",
-                                    host = "127.0.0.1",
-                                    port = "5432",
-                                    database = "peloton")
-    cursor = connection.cursor()
-
-    insert_workout_data_query = '''
-                                    INSERT INTO workouts (workoutId, fitness_discipline, created_at, calories, instructorName, durationSeconds, distance_miles)
-                                    VALUES
-                                    ( %s, %s, %s, %s, %s, %s, %s) 
-                                    ON CONFLICT (workoutId) 
-                                    DO NOTHING;
+# Number of workouts written per INSERT statement (and per transaction)
+BATCH_SIZE = 500
+
+# Number of workouts whose metrics are fetched at once
+FETCHERS = 8
+
+# How many items each stage of the pipeline may get ahead of the next one
+QUEUE_SIZE = 1000
+
+# With --metrics, also write a batch out once this many bytes of samples are waiting
+METRICS_BATCH_BYTES = 16 * 1024 * 1024
+
+# Marks the end of a queue
+_DONE = object()
+
+# created_at is stored as UTC without a timezone. Postgres converts the (timezone aware) datetimes
+# we insert to the session's TimeZone, so pin that to UTC rather than the server's default
+DB_SETTINGS = dict(user = "rivkahcarl",
+                   password = "",
+                   host = "127.0.0.1",
+                   port = "5432",
+                   database = "peloton",
+                   options = "-c timezone=UTC")
+
+create_basic_workout_table_query = '''
+                                    CREATE TABLE IF NOT EXISTS workouts
+                                    (workoutId varchar PRIMARY KEY      NOT NULL
+                                     , fitness_discipline varchar       NOT NULL
+                                     , created_at   timestamp           NOT NULL
+                                     , calories decimal
+                                     , instructorName varchar
+                                     , durationSeconds decimal          NOT NULL
+                                     , distance_miles  decimal
+                                    );
+                                    CREATE INDEX IF NOT EXISTS workouts_created_at ON workouts (created_at);
+                                    CREATE INDEX IF NOT EXISTS workouts_fitness_discipline ON workouts (fitness_discipline, created_at);
+                                    '''
+
+# Where the next run picks up from: the newest created_at as of the last run that finished. Rows
+# are committed batch by batch (and not in created_at order), so after a failed run max(created_at)
+# in workouts can be past workouts that were never written.
+# revision goes up with every change to the rollups, so the dashboard knows when to reload them
+create_ingest_state_table_query = '''
+                                    CREATE TABLE IF NOT EXISTS ingest_state
+                                    (id boolean PRIMARY KEY DEFAULT TRUE CHECK (id)
+                                     , watermark timestamp
+                                     , revision bigint                  NOT NULL DEFAULT 0
+                                    );
+                                    ALTER TABLE ingest_state ADD COLUMN IF NOT EXISTS revision bigint NOT NULL DEFAULT 0;
+                                    INSERT INTO ingest_state (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
+                                    '''
+
+# One row per second of each workout (missing samples are NULL)
+create_workout_metrics_table_query = '''
+                                    CREATE TABLE IF NOT EXISTS workout_metrics
+                                    (workoutId varchar                  NOT NULL
+                                     , t_offset integer                 NOT NULL
+                                     , output double precision
+                                     , cadence double precision
+                                     , resistance double precision
+                                     , speed double precision
+                                     , heart_rate double precision
+                                     , PRIMARY KEY (workoutId, t_offset)
+                                    );
+                                    CREATE INDEX IF NOT EXISTS workout_metrics_t_offset ON workout_metrics (t_offset);
+                                    '''
+
+# Rows are filled in by execute_values, many to a statement. We get back the ids (and days, as
+# the rollups see them) of the workouts that were actually inserted (rather than already there)
+insert_workout_data_query = '''
+                                INSERT INTO workouts (workoutId, fitness_discipline, created_at, calories, instructorName, durationSeconds, distance_miles)
+                                VALUES %s
+                                ON CONFLICT (workoutId)
+                                DO NOTHING
+                                RETURNING workoutId, created_at::date;
+                                '''
+
+# Pre-aggregated versions of workouts, for the dashboard. Kept up to date as workouts are
+# inserted, by recalculating just the days (and instructors) that they touch
+create_rollup_tables_query = '''
+                                    CREATE TABLE IF NOT EXISTS rollup_day_discipline
+                                    (day date                           NOT NULL
+                                     , fitness_discipline varchar       NOT NULL
+                                     , workouts integer                 NOT NULL
+                                     , calories double precision
+                                     , distance_miles double precision
+                                     , PRIMARY KEY (day, fitness_discipline)
+                                    );
+                                    CREATE TABLE IF NOT EXISTS rollup_day_length
+                                    (day date                           NOT NULL
+                                     , duration_minutes double precision NOT NULL
+                                     , workouts integer                 NOT NULL
+                                     , PRIMARY KEY (day, duration_minutes)
+                                    );
+                                    CREATE TABLE IF NOT EXISTS rollup_instructor
+                                    (instructorName varchar PRIMARY KEY NOT NULL
+                                     , workouts integer                 NOT NULL
+                                    );
+                                    '''
+
+# Recalculate the rollups for a list of days and instructors, from workouts
+update_rollups_query = '''
+                                    DELETE FROM rollup_day_discipline WHERE day = ANY(%(days)s);
+                                    INSERT INTO rollup_day_discipline (day, fitness_discipline, workouts, calories, distance_miles)
+                                    SELECT created_at::date, fitness_discipline, count(*), sum(calories), sum(distance_miles)
+                                    FROM workouts
+                                    WHERE created_at::date = ANY(%(days)s)
+                                    GROUP BY 1, 2;
+
+                                    DELETE FROM rollup_day_length WHERE day = ANY(%(days)s);
+                                    INSERT INTO rollup_day_length (day, duration_minutes, workouts)
+                                    SELECT created_at::date, durationSeconds / 60, count(*)
+                                    FROM workouts
+                                    WHERE created_at::date = ANY(%(days)s)
+                                    GROUP BY 1, 2;
+
+                                    DELETE FROM rollup_instructor WHERE instructorName = ANY(%(instructors)s);
+                                    INSERT INTO rollup_instructor (instructorName, workouts)
+                                    SELECT instructorName, count(*)
+                                    FROM workouts
+                                    WHERE instructorName = ANY(%(instructors)s)
+                                    GROUP BY 1;
                                     '''
 
+# Stored workouts without any per-second metrics (eg: from before --metrics was used), newest first
+missing_workout_metrics_query = '''
+                                SELECT workoutId
+                                FROM workouts
+                                WHERE NOT EXISTS (SELECT 1 FROM workout_metrics WHERE workout_metrics.workoutId = workouts.workoutId)
+                                ORDER BY created_at DESC;
+                                '''
+
+# Committed along with the rollups it versions
+bump_revision_query = "UPDATE ingest_state SET revision = revision + 1"
+
+copy_workout_metrics_query = "COPY workout_metrics (workoutId, t_offset, %s) FROM STDIN WITH (FORMAT binary)" % ", ".join(METRIC_COLUMNS)
+
+# Binary COPY framing, see https://www.postgresql.org/docs/current/sql-copy.html#id-1.9.3.55.9.4
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('!h', -1)
+_PGCOPY_NULL = struct.pack('!i', -1)
+_PGCOPY_DOUBLE = struct.Struct('!id')
+
+
+def connect():
+    return psycopg2.connect(**DB_SETTINGS)
+
+
+def create_tables(connection, metrics=False):
+    with connection:
+        with connection.cursor() as cursor:
+            cursor.execute(create_basic_workout_table_query)
+            cursor.execute(create_rollup_tables_query)
+            cursor.execute(create_ingest_state_table_query)
+            if metrics:
+                cursor.execute(create_workout_metrics_table_query)
+    print("Peloton table created if not exists successfully")
+
+
+def update_rollups(cursor, days, instructors):
+    """ Recalculate the rollups for days (from created_at::date, like the rollups themselves) and instructors """
+    days = sorted(set(days))
+    instructors = sorted({instructor for instructor in instructors if instructor is not None})
+    if days:
+        cursor.execute(update_rollups_query, {'days': days, 'instructors': instructors})
+        cursor.execute(bump_revision_query)
+
+
+def rebuild_rollups(connection, force=False):
+    """ Build the rollups from scratch out of everything in workouts. Unless forced, only if they're
+        empty while workouts isn't (eg: the first run since they were added) """
+    with connection:
+        with connection.cursor() as cursor:
+            if not force:
+                cursor.execute("SELECT NOT EXISTS (SELECT 1 FROM rollup_day_discipline) AND EXISTS (SELECT 1 FROM workouts)")
+                if not cursor.fetchone()[0]:
+                    return
+
+            cursor.execute("SELECT DISTINCT created_at::date FROM workouts")
+            days = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT DISTINCT instructorName FROM workouts WHERE instructorName IS NOT NULL")
+            instructors = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute("TRUNCATE rollup_day_discipline, rollup_day_length, rollup_instructor")
+            cursor.execute(update_rollups_query, {'days': days, 'instructors': instructors})
+            cursor.execute(bump_revision_query)
+    print("Rollups rebuilt for %d days" % len(days))
+
+
+def last_watermark(connection):
+    """ created_at (as naive UTC) of the newest workout stored by the last run that finished, or None
+        if there hasn't been one (so everything is loaded, and anything already there skipped) """
+    with connection:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT watermark FROM ingest_state")
+            return cursor.fetchone()[0]
+
+
+def save_watermark(connection):
+    """ Once a run has finished, every workout up to the newest one stored is there """
+    with connection:
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE ingest_state SET watermark = (SELECT max(created_at) FROM workouts)")
+
+
+def metric_samples(workout_id, metrics):
+    """ A workout's per-second metrics, as binary COPY tuples for workout_metrics """
+
+    import numpy
+
+    seconds, values = metric_values(metrics)
+    if not len(seconds):
+        return b''
+
+    workout_id = workout_id.encode('utf-8')
+
+    # Seconds with every metric present all have the same layout, so build those in one go
+    # as a (big endian, unpadded) structured array
+    layout = [('fields', '>i2'), ('id_size', '>i4'), ('id', 'S%d' % len(workout_id)),
+              ('t_offset_size', '>i4'), ('t_offset', '>i4')]
+    for slug in METRIC_COLUMNS:
+        layout += [(slug + '_size', '>i4'), (slug, '>f8')]
+
+    complete = ~numpy.isnan(values).any(axis=1)
+    tuples = numpy.empty(int(complete.sum()), dtype=layout)
+    tuples['fields'] = 2 + len(METRIC_COLUMNS)
+    tuples['id_size'] = len(workout_id)
+    tuples['id'] = workout_id
+    tuples['t_offset_size'] = 4
+    tuples['t_offset'] = seconds[complete]
+    for index, slug in enumerate(METRIC_COLUMNS):
+        tuples[slug + '_size'] = 8
+        tuples[slug] = values[complete, index]
+
+    # The rest have NULLs in them, so vary in size
+    prefix = struct.pack('!hi', 2 + len(METRIC_COLUMNS), len(workout_id)) + workout_id
+    gaps = [prefix + struct.pack('!ii', 4, seconds[row]) + b''.join(
+                _PGCOPY_NULL if value != value else _PGCOPY_DOUBLE.pack(8, value) for value in values[row])
+            for row in numpy.flatnonzero(~complete)]
+
+    return tuples.tobytes() + b''.join(gaps)
+
+
+def write_workouts(connection, rows, samples=None):
+    """ Insert a batch of rows with a single multi-row INSERT, in a single transaction (along with
+        updating the rollups). samples optionally maps workout ids to their metric_samples(), which are
+        loaded with a binary COPY for the workouts that were inserted. Returns the number of rows inserted """
+    with connection:
+        with connection.cursor() as cursor:
+            inserted = execute_values(cursor, insert_workout_data_query, rows, page_size=len(rows), fetch=True)
+
+            inserted_ids = {workout_id for workout_id, _ in inserted}
+            update_rollups(cursor, [day for _, day in inserted], [row[4] for row in rows if row[0] in inserted_ids])
+
+            if samples:
+                copy_metric_samples(cursor, b''.join(samples.get(workout_id, b'') for workout_id, _ in inserted))
+
+            return len(inserted)
+
+
+def copy_metric_samples(cursor, data):
+    """ Load metric_samples() (of any number of workouts, joined together) with a binary COPY """
+    if data:
+        cursor.copy_expert(copy_workout_metrics_query, io.BytesIO(_PGCOPY_HEADER + data + _PGCOPY_TRAILER))
+
+
+class PipelineStopped(Exception):
+    """ Raised within a stage once the pipeline has been stopped """
+    pass
+
+
+class PipelineStage:
+    """ Throughput counters for one stage of the pipeline """
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
 
-    workouts = PelotonWorkout.list()
-
-
-    # Pull out subset of relevant data for dashboard
-    for workout in workouts:
-
-        if workout.fitness_discipline != 'meditation':
-
-            # Gather Calories
-            # In this library calories are found in the PelotonWorkoutMetrics object
-            # Not all workouts have associated calorie measures
-            if hasattr(workout.metrics, 'calories_summary'): 
-                calories = workout.metrics.calories_summary.value if workout.metrics.calories_summary.slug == 'calories' else 0
-            else:
-                print("The following class does not have Calorie object: %s" % workout.id, workout.fitness_discipline)
-                calories = 0 ## TODO - Figure out why and which class is missing calories
-
-            # Gather distance in miles
-            if hasattr(workout.metrics, 'distance_summary'):
-                distance_miles = workout.metrics.distance_summary.value if workout.metrics.distance_summary.unit == 'mi' else 0
-            else:
-                print("The following class does not have distance in miles %s" % workout.id, workout.fitness_discipline)
-                distance_miles = 0 
-
-            # Gather Instructors names
-            # Instructor name are found within 'ride.instructor.name' - not all workouts have an associated instructor
-            if hasattr(workout.ride, 'instructor'):
-                instructorName = workout.ride.instructor.name
-            else: 
-                print("Workout is missing Instructor information, Id= %s" % workout.id) 
-                instructorName = None
-
-            # Gather Duration
-            if hasattr(workout.ride, 'duration'):
-                durationSeconds = workout.ride.duration
-            else: 
-                print("Workout is missing duration information, Id= %s" % workout.id)
-                durationSeconds = None
-            
-            record_to_insert = (workout.id, workout.fitness_discipline, workout.created_at, calories, instructorName, durationSeconds, distance_miles)
-            cursor.execute(insert_workout_data_query, record_to_insert)
-
-            connection.commit()
-            count = cursor.rowcount
-            print (count, "Record inserted successfully into peloton table")
-
-        else:
-            pass #Dont care for meditation classes at this point in time- mostly concerned about active fitness
-            
-
-except (Exception, psycopg2.Error) as error :
-    if(connection):
+    @contextmanager
+    def timed(self, items=1):
+        """ Count items as processed, and the time taken as time spent busy
+            (rather than waiting on the stages around us) """
+        start = time.perf_counter()
+        yield
+        with self._lock:
+            self.items += items
+            self.busy += time.perf_counter() - start
+
+    def timed_iter(self, iterable):
+        """ Iterate over iterable, counting the time spent waiting on each item as busy """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, _DONE)
+            if item is _DONE:
+                return
+            with self._lock:
+                self.items += 1
+                self.busy += time.perf_counter() - start
+            yield item
+
+    def report(self, elapsed):
+        rate = self.items / elapsed if elapsed else 0
+        busy = self.busy / (elapsed * self.workers) if elapsed else 0
+        return "%-8s x%-2d %7d items %9.1f/s %4.0f%% busy" % (self.name, self.workers, self.items, rate, busy * 100)
+
+
+class Pipeline:
+    """ Runs each stage in its own thread(s), connected by bounded queues, so that network and
+        database waits overlap and a slow stage holds back the ones feeding it (rather than
+        letting work pile up in memory). The first error stops every stage and is raised from run() """
+
+    def __init__(self):
+        self.stages = []
+        self._threads = []
+        self._stop = threading.Event()
+        self._error = None
+
+    def add(self, name, target, workers=1):
+        """ Add a stage, running target(stage) in each of its workers """
+        stage = PipelineStage(name, workers)
+        self.stages.append(stage)
+        for _ in range(workers):
+            self._threads.append(threading.Thread(target=self._run, args=(target, stage), name=name, daemon=True))
+        return stage
+
+    def _run(self, target, stage):
+        try:
+            target(stage)
+        except PipelineStopped:
+            pass
+        except Exception as error:
+            if self._error is None:
+                self._error = error
+            self._stop.set()
+
+    def put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                return q.put(item, timeout=0.1)
+            except queue.Full:
+                pass
+        raise PipelineStopped()
+
+    def get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        raise PipelineStopped()
+
+    def run(self):
+        """ Run every stage to completion, returning how long it took """
+        start = time.perf_counter()
+        for thread in self._threads:
+            thread.start()
+        for thread in self._threads:
+            thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+        return time.perf_counter() - start
+
+
+def ingest(connection, since=None, batch_size=BATCH_SIZE, fetchers=FETCHERS, queue_size=QUEUE_SIZE, metrics=False):
+    """ Load every workout newer than since into the workouts table, through a pipeline of
+
+        pages -> metrics (fetchers at once) -> rows -> batched writes
+
+    With metrics, their per-second metrics go into the workout_metrics table as well.
+    Returns the number of rows inserted """
+
+    pipeline = Pipeline()
+    workouts = queue.Queue(queue_size)
+    fetched = queue.Queue(queue_size)
+    rows = queue.Queue(queue_size)
+    inserted = []
+
+    def produce(stage):
+        # Workouts are handed out a page at a time, with the next page fetched in the background
+        for workout in stage.timed_iter(PelotonWorkout.iter(since=since)):
+            pipeline.put(workouts, workout)
+
+        # One for each fetcher
+        for _ in range(fetchers):
+            pipeline.put(workouts, _DONE)
+
+    def fetch(stage):
+        while True:
+            workout = pipeline.get(workouts)
+            if workout is _DONE:
+                return pipeline.put(fetched, _DONE)
+
+            # Unless we're storing them, we only need calories and distance, so skip the
+            # per-second series
+            if workout.fitness_discipline != 'meditation':
+                with stage.timed():
+                    if metrics:
+                        workout.load_metrics(every_n=1, summaries_only=False)
+                    else:
+                        workout.load_metrics(summaries_only=True)
+
+            pipeline.put(fetched, workout)
+
+    def extract(stage):
+        remaining = fetchers
+        while remaining:
+            workout = pipeline.get(fetched)
+            if workout is _DONE:
+                remaining -= 1
+                continue
+
+            with stage.timed():
+                row = workout_row(workout)
+                samples = metric_samples(workout.id, workout.metrics) if metrics and row is not None else b''
+            if row is not None:
+                pipeline.put(rows, (row, samples))
+
+        pipeline.put(rows, _DONE)
+
+    def write(stage):
+        batch, samples, samples_size = [], {}, 0
+        while True:
+            item = pipeline.get(rows)
+            if item is not _DONE:
+                row, workout_samples = item
+                batch.append(row)
+                if workout_samples:
+                    samples[row[0]] = workout_samples
+                    samples_size += len(workout_samples)
+
+            full = len(batch) >= batch_size or samples_size >= METRICS_BATCH_BYTES
+            if batch and (item is _DONE or full):
+                with stage.timed(len(batch)):
+                    count = write_workouts(connection, batch, samples)
+                inserted.append(count)
+                print(count, "Records inserted successfully into peloton table")
+                batch, samples, samples_size = [], {}, 0
+
+            if item is _DONE:
+                return
+
+    pipeline.add("pages", produce)
+    pipeline.add("metrics", fetch, workers=fetchers)
+    pipeline.add("rows", extract)
+    pipeline.add("writes", write)
+
+    elapsed = pipeline.run()
+
+    total = sum(inserted)
+    print("Inserted %d records in %.1fs" % (total, elapsed))
+    for stage in pipeline.stages:
+        print(stage.report(elapsed))
+
+    return total
+
+
+def backfill_metrics(connection, fetchers=FETCHERS, queue_size=QUEUE_SIZE):
+    """ Load per-second metrics for every stored workout that doesn't have any yet (ingest() only loads
+        them for the workouts it inserts), through a pipeline of
+
+        workout ids -> metrics (fetchers at once) -> COPY
+
+    Workouts that have no per-second metrics at all are asked for again every time.
+    Returns the number of workouts whose metrics were loaded """
+
+    with connection:
+        with connection.cursor() as cursor:
+            cursor.execute(missing_workout_metrics_query)
+            workout_ids = [workout_id for workout_id, in cursor.fetchall()]
+
+    pipeline = Pipeline()
+    pending = queue.Queue(queue_size)
+    fetched = queue.Queue(queue_size)
+    loaded = []
+
+    def produce(stage):
+        for workout_id in stage.timed_iter(workout_ids):
+            pipeline.put(pending, workout_id)
+
+        # One for each fetcher
+        for _ in range(fetchers):
+            pipeline.put(pending, _DONE)
+
+    def fetch(stage):
+        while True:
+            workout_id = pipeline.get(pending)
+            if workout_id is _DONE:
+                return pipeline.put(fetched, _DONE)
+
+            with stage.timed():
+                metrics = PelotonWorkoutMetricsFactory.get(workout_id, every_n=1, summaries_only=False)
+                samples = metric_samples(workout_id, metrics)
+            pipeline.put(fetched, samples)
+
+    def write(stage):
+        remaining, batch, batch_size = fetchers, [], 0
+        while remaining or batch:
+            samples = pipeline.get(fetched) if remaining else _DONE
+            if samples is _DONE:
+                remaining -= 1
+            elif samples:
+                batch.append(samples)
+                batch_size += len(samples)
+
+            if batch and (not remaining or batch_size >= METRICS_BATCH_BYTES):
+                with stage.timed(len(batch)):
+                    with connection:
+                        with connection.cursor() as cursor:
+                            copy_metric_samples(cursor, b''.join(batch))
+                loaded.append(len(batch))
+                batch, batch_size = [], 0
+
+    pipeline.add("ids", produce)
+    pipeline.add("metrics", fetch, workers=fetchers)
+    pipeline.add("copies", write)
+
+    elapsed = pipeline.run()
+
+    total = sum(loaded)
+    print("Loaded metrics for %d of %d workouts in %.1fs" % (total, len(workout_ids), elapsed))
+    for stage in pipeline.stages:
+        print(stage.report(elapsed))
+
+    return total
+
+
+def main(batch_size=BATCH_SIZE, fetchers=FETCHERS, queue_size=QUEUE_SIZE, metrics=False, rebuild=False,
+         backfill=False):
+
+    connection = connect()
+    try:
+        create_tables(connection, metrics=metrics or backfill)
+        rebuild_rollups(connection, force=rebuild)
+
+        # Only fetch workouts newer than the newest one stored by the last run that finished. The API
+        # lists workouts newest first, so paging stops as soon as we reach it
+        watermark = last_watermark(connection)
+
+        ingest(connection, since=watermark, batch_size=batch_size, fetchers=fetchers, queue_size=queue_size,
+               metrics=metrics)
+
+        # Only now can the next run skip what this one loaded
+        save_watermark(connection)
+
+        if backfill:
+            backfill_metrics(connection, fetchers=fetchers, queue_size=queue_size)
+
+    except (Exception, psycopg2.Error) as error :
         print("Failed to insert record into peloton table", error)
 
-finally:
-    #closing database connection.
-    if(connection):
-        cursor.close()
+    finally:
+        #closing database connection.
         connection.close()
         print("PostgreSQL connection is closed")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load your Peloton workouts into Postgres")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="workouts written per INSERT/transaction (default: %(default)s)")
+    parser.add_argument('--fetchers', type=int, default=FETCHERS,
+                        help="workouts whose metrics are fetched at once (default: %(default)s)")
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE,
+                        help="items each stage may get ahead of the next (default: %(default)s)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="also store per-second metrics (output, cadence..) in the workout_metrics table, for "
+                             "the workouts this run inserts (see --backfill-metrics for those already stored)")
+    parser.add_argument('--backfill-metrics', action='store_true',
+                        help="load per-second metrics for every stored workout that doesn't have any yet")
+    parser.add_argument('--rebuild-rollups', action='store_true',
+                        help="rebuild the dashboard's rollup tables from scratch")
+    args = parser.parse_args()
+
+    main(batch_size=args.batch_size, fetchers=args.fetchers, queue_size=args.queue_size, metrics=args.metrics,
+         rebuild=args.rebuild_rollups, backfill=args.backfill_metrics)
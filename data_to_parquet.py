@@ -0,0 +1,230 @@
+import argparse
+import os
+import time
+import uuid
+
+import numpy
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from itertools import islice
+
+from peloton import PelotonWorkout
+from workout_data import METRIC_COLUMNS
+from workout_data import metric_values
+from workout_data import workout_row
+
+
+'''
+Exports workouts (and optionally their per-second metrics) to Parquet files, partitioned by year and month
+(EXPORT_PATH/workouts/year=2020/month=5/part-....parquet), for loading straight into pandas/Arrow without
+going through Postgres. Every run only adds workouts newer than the newest one already exported.
+
+The workouts columns match the workouts table, so the dashboard can read either.
+'''
+
+EXPORT_PATH = "peloton_parquet"
+
+# Number of workouts whose metrics are fetched, and which are written, together
+BATCH_SIZE = 500
+
+# Times a batch's failed metrics loads are tried again (on top of the client's own retries) before giving up
+PREFETCH_RETRIES = 2
+
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16()), ('month', pa.int8())]), flavor='hive')
+
+WORKOUTS_SCHEMA = pa.schema([
+    ('workoutid', pa.string()),
+    ('fitness_discipline', pa.string()),
+    ('created_at', pa.timestamp('us')),
+    ('calories', pa.float64()),
+    ('instructorname', pa.string()),
+    ('durationseconds', pa.float64()),
+    ('distance_miles', pa.float64()),
+    ('year', pa.int16()),
+    ('month', pa.int8()),
+])
+
+WORKOUT_METRICS_SCHEMA = pa.schema(
+    [('workoutid', pa.string()), ('t_offset', pa.int32())] +
+    [(column, pa.float64()) for column in METRIC_COLUMNS] +
+    [('year', pa.int16()), ('month', pa.int8())])
+
+
+def batches(iterable, size):
+    """ Split an iterable up into lists of (at most) size items """
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def workouts_dataset(path):
+    """ The exported workouts as a pyarrow Dataset (or None if there aren't any yet) """
+    path = os.path.join(path, 'workouts')
+    if not os.path.isdir(path):
+        return None
+    return ds.dataset(path, format='parquet', partitioning=PARTITIONING)
+
+
+def workouts_filter(since=None, until=None, disciplines=None):
+    """ Dataset filter for workouts created from since up to (but not including) until, in disciplines
+        (None for no limit). The year bounds let whole partitions be skipped without opening them """
+    condition = ds.scalar(True)
+    if since is not None:
+        condition &= (ds.field('year') >= since.year) & (ds.field('created_at') >= pa.scalar(since, pa.timestamp('us')))
+    if until is not None:
+        condition &= (ds.field('year') <= until.year) & (ds.field('created_at') < pa.scalar(until, pa.timestamp('us')))
+    if disciplines:
+        condition &= ds.field('fitness_discipline').isin(list(disciplines))
+    return condition
+
+
+def load_workouts(path=EXPORT_PATH, columns=None, since=None, until=None, disciplines=None):
+    """ Load the exported workouts (or just columns of them) into a pandas DataFrame, optionally just
+        those created from since up to until, in disciplines. Column chunks are read straight into
+        Arrow and handed over to pandas without any per-row work, freeing the Arrow copy as they go """
+    dataset = workouts_dataset(path)
+    if dataset is None:
+        table = WORKOUTS_SCHEMA.empty_table()
+    else:
+        table = dataset.to_table(columns=columns, filter=workouts_filter(since, until, disciplines))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def latest_created_at(path):
+    """ created_at of the newest workout we've already exported (or None) """
+    dataset = workouts_dataset(path)
+    if dataset is None:
+        return None
+    return pc.max(dataset.to_table(columns=['created_at'])['created_at']).as_py()
+
+
+def export_version(path=EXPORT_PATH):
+    """ Changes whenever an export adds (or removes) workouts files: their number, and the last time
+        one was written. Only the directory listing is read """
+    files = [os.path.join(directory, name) for directory, _, names in os.walk(os.path.join(path, 'workouts'))
+             for name in names]
+    return '%d-%d' % (len(files), max((os.stat(name).st_mtime_ns for name in files), default=0))
+
+
+def workouts_table(workouts):
+    rows = [row for row in map(workout_row, workouts) if row is not None]
+    workoutid, fitness_discipline, created_at, calories, instructorname, durationseconds, distance_miles = zip(*rows) if rows else [()] * 7
+
+    # Stored as UTC, without a timezone, like the workouts table
+    created_at = [value.replace(tzinfo=None) for value in created_at]
+
+    return pa.table([
+        pa.array(workoutid, pa.string()),
+        pa.array(fitness_discipline, pa.string()),
+        pa.array(created_at, pa.timestamp('us')),
+        pa.array(calories, pa.float64()),
+        pa.array(instructorname, pa.string()),
+        pa.array(durationseconds, pa.float64()),
+        pa.array(distance_miles, pa.float64()),
+        pa.array([value.year for value in created_at], pa.int16()),
+        pa.array([value.month for value in created_at], pa.int8()),
+    ], schema=WORKOUTS_SCHEMA)
+
+
+def workout_metrics_table(workouts):
+    """ Per-second metrics of workouts, one row per second (like the workout_metrics table) """
+
+    tables = []
+    for workout in workouts:
+        if workout.fitness_discipline == 'meditation':
+            continue
+
+        seconds, values = metric_values(workout.metrics)
+        if not len(seconds):
+            continue
+
+        columns = [pa.array([workout.id] * len(seconds), pa.string()), pa.array(seconds)]
+        columns += [pa.array(values[:, index], from_pandas=True) for index in range(len(METRIC_COLUMNS))]
+
+        created_at = workout.created_at
+        columns.append(pa.array(numpy.full(len(seconds), created_at.year, numpy.int16)))
+        columns.append(pa.array(numpy.full(len(seconds), created_at.month, numpy.int8)))
+
+        tables.append(pa.table(columns, schema=WORKOUT_METRICS_SCHEMA))
+
+    if not tables:
+        return WORKOUT_METRICS_SCHEMA.empty_table()
+    return pa.concat_tables(tables)
+
+
+def prefetch_metrics(workouts, metrics=False, retries=PREFETCH_RETRIES):
+    """ Load the metrics of workouts, a batch at a time: just the summaries unless we're exporting the
+        per-second metrics too. Failed loads are tried again, up to retries times, before raising """
+    workouts = [workout for workout in workouts if workout.fitness_discipline != 'meditation']
+    for _ in range(retries + 1):
+        errors = PelotonWorkout.prefetch(workouts, fields=['metrics'], every_n=1, summaries_only=not metrics)
+        if not errors:
+            return
+        workouts = [workout for workout in workouts if workout.id in errors]
+
+    raise next(iter(errors.values()))['metrics']
+
+
+def write_table(table, path, name, token):
+    """ Add table's rows to the name dataset under path, in new files tagged with token (which
+        must be unique to the call, or earlier files are overwritten) """
+    if not table.num_rows:
+        return
+    ds.write_dataset(table, os.path.join(path, name), format='parquet', partitioning=PARTITIONING,
+                     basename_template='part-%s-{i}.parquet' % token,
+                     existing_data_behavior='overwrite_or_ignore')
+
+
+def remove_files(path, token):
+    """ Remove every file written with token (eg: by a run that failed part way through) """
+    for directory, _, files in os.walk(path):
+        for name in files:
+            if token in name:
+                os.remove(os.path.join(directory, name))
+
+
+def export(path=EXPORT_PATH, metrics=False, batch_size=BATCH_SIZE):
+    """ Export every workout newer than the ones already under path. Returns the number exported """
+
+    start = time.perf_counter()
+    watermark = latest_created_at(path)
+
+    # Files from this run share a token. Metrics are written batch by batch as we go, but the
+    # workouts (which the watermark comes from) only once everything has been fetched, so that a
+    # failure part way through can't leave gaps behind
+    token = uuid.uuid4().hex
+    tables = []
+    try:
+        for index, batch in enumerate(batches(PelotonWorkout.iter(since=watermark), batch_size)):
+            prefetch_metrics(batch, metrics=metrics)
+
+            tables.append(workouts_table(batch))
+            if metrics:
+                write_table(workout_metrics_table(batch), path, 'workout_metrics', '%s-%d' % (token, index))
+
+        workouts = pa.concat_tables(tables) if tables else WORKOUTS_SCHEMA.empty_table()
+        write_table(workouts, path, 'workouts', token)
+
+    except BaseException:
+        remove_files(path, token)
+        raise
+
+    print("Exported %d workouts to %s in %.1fs" % (workouts.num_rows, path, time.perf_counter() - start))
+    return workouts.num_rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export your Peloton workouts to Parquet")
+    parser.add_argument('--path', default=EXPORT_PATH,
+                        help="directory to export to (default: %(default)s)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="also export per-second metrics (output, cadence..) to PATH/workout_metrics")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="workouts fetched and written together (default: %(default)s)")
+    args = parser.parse_args()
+
+    export(path=args.path, metrics=args.metrics, batch_size=args.batch_size)
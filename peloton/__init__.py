@@ -4,6 +4,10 @@
 from .peloton import NotLoaded
 from .peloton import PelotonException
 from .peloton import PelotonAPI
+from .peloton import PelotonCache
+from .peloton import PelotonLRUCache
+from .peloton import PelotonIdentityMap
+from .peloton import PelotonRateLimiter
 from .peloton import PelotonUser
 from .peloton import PelotonWorkout
 from .peloton import PelotonRide
@@ -16,6 +20,10 @@ _ALL_ = [
     "NotLoaded",
     "PelotonException",
     "PelotonAPI",
+    "PelotonCache",
+    "PelotonLRUCache",
+    "PelotonIdentityMap",
+    "PelotonRateLimiter",
 
     "PelotonUser",
     "PelotonWorkout",
@@ -0,0 +1,325 @@
+#! /usr/bin/env python3.6
+# -*- coding: latin-1 -*-
+
+""" asyncio flavoured versions of the factory classes in peloton.peloton
+
+These return the very same PelotonWorkout/PelotonWorkoutMetrics objects as
+their blocking counterparts, but do all of their I/O on the running event
+loop through a single aiohttp session. Requires `aiohttp` to be installed.
+
+Keep in mind that lazy loaded attributes on the returned objects (eg:
+`workout.metrics`) are still loaded with a blocking request if you touch
+them - fetch them explicitly with AsyncPelotonWorkoutMetricsFactory instead.
+"""
+
+import asyncio
+import json
+import weakref
+
+import aiohttp
+
+from . import peloton as _peloton
+from .peloton import get_logger
+from .peloton import PelotonAPI
+from .peloton import PelotonClientError
+from .peloton import PelotonServerError
+from .peloton import PelotonRedirectError
+from .peloton import PelotonWorkoutFactory
+from .peloton import PelotonWorkoutMetrics
+
+
+class AsyncPelotonAPI:
+    """ Base class that the async factory classes inherit from.
+    This class is _not_ meant to be utilized directly, so don't do it.
+
+    Mirrors PelotonAPI, with all state shared by every async factory
+    """
+
+    peloton_username = None
+    peloton_password = None
+
+    # Hold an aiohttp.ClientSession instance that we're going to
+    # rely on to make API calls
+    peloton_session = None
+
+    # Being friendly (by default), use the same page size
+    # that the Peloton website uses
+    page_size = 10
+
+    # Hold our user ID (pulled when we authenticate to the API)
+    user_id = None
+
+    # Maximum number of requests that may be in flight at once,
+    # no matter how many coroutines are asking
+    max_concurrency = 10
+
+    # Headers we'll be using for each request
+    headers = PelotonAPI.headers
+
+    # The event loop our session belongs to
+    _session_loop = None
+
+    # asyncio primitives can only be used from the event loop they were
+    # first used on, so every loop (eg: each asyncio.run()) gets its own
+    # {'semaphore': .., 'login_lock': ..}
+    _loop_state = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def _get_loop_state(cls):
+        """ Return the semaphore and login lock for the running loop
+        """
+
+        loop = asyncio.get_running_loop()
+        state = AsyncPelotonAPI._loop_state.get(loop)
+        if state is None:
+            state = AsyncPelotonAPI._loop_state[loop] = {
+                'semaphore': asyncio.Semaphore(cls.max_concurrency),
+                'login_lock': asyncio.Lock(),
+            }
+
+        return state
+
+    @classmethod
+    def _get_semaphore(cls):
+        """ Return the semaphore that bounds our in-flight requests
+        """
+        return cls._get_loop_state()['semaphore']
+
+    @classmethod
+    def _current_session(cls):
+        """ Return our session, unless it belongs to another event loop
+            (which it can't be used from), in which case we'll log in again
+        """
+
+        session = AsyncPelotonAPI.peloton_session
+        if session is not None and \
+                AsyncPelotonAPI._session_loop is not asyncio.get_running_loop():
+            get_logger().warning(
+                "Session belongs to another event loop (call "
+                "AsyncPelotonAPI.close() before that loop ends), "
+                "logging in again")
+            AsyncPelotonAPI.peloton_session = None
+            AsyncPelotonAPI._session_loop = None
+            AsyncPelotonAPI.user_id = None
+            return None
+
+        return session
+
+    @classmethod
+    async def _api_request(cls, uri, params={}):
+        """ Base coroutine that everything will use under the hood to
+            interact with the API
+
+        Returns the decoded json body, or raises an exception on error
+        """
+
+        # Create a session if we don't have one yet
+        if cls._current_session() is None:
+            await cls._create_api_session()
+
+        url = _peloton._BASE_URL + uri
+        async with cls._get_semaphore():
+            get_logger().debug("Request {} [{}]".format(url, params))
+            async with AsyncPelotonAPI.peloton_session.get(
+                    url, headers=cls.headers, params=params) as resp:
+                content = await resp.read()
+
+        get_logger().debug("Response {}: [{}]".format(resp.status, content))
+        cls._raise_for_status(resp, content)
+
+        return json.loads(content)
+
+    @classmethod
+    async def _create_api_session(cls):
+        """ Create a session instance for communicating with the API
+
+        Concurrent callers share a single login
+        """
+
+        async with cls._get_loop_state()['login_lock']:
+
+            # Someone else logged in while we were waiting
+            if cls._current_session() is not None:
+                return
+
+            username = cls.peloton_username or getattr(
+                _peloton, 'PELOTON_USERNAME', None)
+            password = cls.peloton_password or getattr(
+                _peloton, 'PELOTON_PASSWORD', None)
+
+            if username is None or password is None:
+                raise PelotonClientError(
+                    "The Peloton Client Library requires a `username` "
+                    "and `password` be set in "
+                    "`/.config/peloton, under section `peloton`", None)
+
+            payload = {
+                'username_or_email': username,
+                'password': password
+            }
+
+            session = aiohttp.ClientSession()
+            try:
+                async with session.post(
+                        _peloton._BASE_URL + '/auth/login', json=payload,
+                        headers=cls.headers) as resp:
+                    content = await resp.read()
+
+                cls._raise_for_status(resp, content)
+
+            except Exception:
+                await session.close()
+                raise
+
+            # Set our User ID and session on the shared base class
+            AsyncPelotonAPI.user_id = json.loads(content)['user_id']
+            AsyncPelotonAPI.peloton_session = session
+            AsyncPelotonAPI._session_loop = asyncio.get_running_loop()
+
+    @classmethod
+    async def close(cls):
+        """ Close our session (and its connections). The next request
+            will log in again
+        """
+
+        session = AsyncPelotonAPI.peloton_session
+        AsyncPelotonAPI.peloton_session = None
+        AsyncPelotonAPI._session_loop = None
+        AsyncPelotonAPI.user_id = None
+        AsyncPelotonAPI._loop_state.pop(asyncio.get_running_loop(), None)
+
+        if session is not None:
+            await session.close()
+
+    @staticmethod
+    def _raise_for_status(resp, content):
+
+        if 300 <= resp.status < 400:
+            raise PelotonRedirectError("Unexpected Redirect", resp)
+
+        elif 400 <= resp.status < 500:
+            raise PelotonClientError(content, resp)
+
+        elif 500 <= resp.status < 600:
+            raise PelotonServerError(content, resp)
+
+
+class AsyncPelotonWorkoutFactory(AsyncPelotonAPI):
+    """ Class that handles fetching data and instantiating objects
+
+    See PelotonWorkoutFactory for details
+    """
+
+    @classmethod
+    async def list(cls, results_per_page=10):
+        """ Return a list of PelotonWorkout instances that describe
+            each workout
+
+        Every page after the first is fetched concurrently (bounded by
+        max_concurrency), results are returned in the usual order
+        """
+
+        if cls._current_session() is None:
+            await cls._create_api_session()
+
+        # Get our first page, which includes number of successive pages
+        res = await cls._workouts_page(0, results_per_page)
+        pages = [res] + list(await asyncio.gather(*[
+            cls._workouts_page(page, results_per_page)
+            for page in range(1, res['page_count'])]))
+
+        return [cls._workout(workout)
+                for res in pages for workout in res['data']]
+
+    @classmethod
+    async def iter_pages(cls, results_per_page=10):
+        """ Asynchronously iterate over the users workouts, one page
+            (list of PelotonWorkout instances) at a time
+        """
+
+        if cls._current_session() is None:
+            await cls._create_api_session()
+
+        page, page_count = 0, 1
+        while page < page_count:
+            res = await cls._workouts_page(page, results_per_page)
+            page_count = res['page_count']
+            page += 1
+
+            yield [cls._workout(workout) for workout in res['data']]
+
+    @classmethod
+    async def get(cls, workout_id):
+        """ Get workout details by workout_id
+        """
+
+        uri = '/api/workout/{}'.format(workout_id)
+        params = {
+            'joins': 'ride,ride.instructor'
+        }
+
+        workout = await cls._api_request(uri, params)
+        return cls._workout(workout)
+
+    @classmethod
+    async def latest(cls):
+        """ Returns an instance of PelotonWorkout that represents
+            the latest workout
+        """
+
+        if cls._current_session() is None:
+            await cls._create_api_session()
+
+        res = await cls._workouts_page(0, 1)
+        return cls._workout(res['data'][0])
+
+    @staticmethod
+    def _workout(data):
+        """ Turn raw workout data into a PelotonWorkout, merged into the one
+            the default client already holds for this workout (if any), so
+            that we hand out the same objects as PelotonWorkoutFactory
+        """
+        return PelotonWorkoutFactory._workout(data, PelotonAPI.default())
+
+    @classmethod
+    async def _workouts_page(cls, page, results_per_page):
+        """ Fetch a single page of the users workout list (raw json)
+        """
+
+        uri = '/api/user/{}/workouts'.format(AsyncPelotonAPI.user_id)
+        params = {
+            'page': page,
+            'limit': results_per_page,
+            'joins': 'ride,ride.instructor'
+        }
+
+        return await cls._api_request(uri, params)
+
+
+class AsyncPelotonWorkoutMetricsFactory(AsyncPelotonAPI):
+    """ Class to handle fetching and transformation of metric data
+    """
+
+    @classmethod
+    async def get(cls, workout_id, every_n=None, summaries_only=None):
+        """ Returns a PelotonWorkoutMetrics instance for the workout
+
+        See PelotonWorkoutMetricsFactory.get for details
+        """
+
+        if every_n is None:
+            every_n = PelotonAPI.metrics_every_n
+
+        if summaries_only is None:
+            summaries_only = PelotonAPI.metrics_summaries_only
+
+        if summaries_only:
+            every_n = _peloton._SUMMARIES_EVERY_N
+
+        uri = '/api/workout/{}/performance_graph'.format(workout_id)
+        params = {
+            'every_n': every_n
+        }
+
+        res = await cls._api_request(uri, params)
+        return PelotonWorkoutMetrics(summaries_only=summaries_only, **res)
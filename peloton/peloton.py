@@ -2,13 +2,26 @@
 # -*- coding: latin-1 -*-
 
 import os
+import json
+import time
+import random
+import sqlite3
 import requests
+import requests.adapters
 import logging
 import decimal
+import weakref
+import functools
+import threading
+import concurrent.futures
 
 from datetime import datetime
 from datetime import timezone
 from datetime import date
+from array import array
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
 from .version import __version__
 
 # Set our base URL location
@@ -17,6 +30,13 @@ _BASE_URL = 'https://api.onepeloton.com'
 # Being friendly, let Peloton know who we are (eg: not the web ui)
 _USER_AGENT = "peloton-client-library/{}".format(__version__)
 
+# Stands in for missing samples in metric series
+_NAN = float('nan')
+
+# Resolution we ask for when we only care about metric summaries. They
+# cover the whole workout regardless, so keep the series as tiny as we can
+_SUMMARIES_EVERY_N = 3600
+
 
 def get_logger():
     """ To change log level from calling code, use something like
@@ -35,6 +55,10 @@ def get_logger():
 
 
 SHOW_WARNINGS = False
+PELOTON_USERNAME = None
+PELOTON_PASSWORD = None
+CACHE_PATH = None
+SESSION_PATH = None
 
 try:
 
@@ -75,6 +99,20 @@ try:
     except:
         SSL_CERT = None
 
+    # If set, cache responses that never change (eg: finished workouts)
+    # in a SQLite database at this path
+    try:
+        CACHE_PATH = parser.get("peloton", "cache_path")
+    except:
+        CACHE_PATH = None
+
+    # If set, keep our logged in session here (readable only by you) so
+    # that new processes don't need to log in again
+    try:
+        SESSION_PATH = parser.get("peloton", "session_path")
+    except:
+        SESSION_PATH = None
+
 except Exception:
     get_logger().error(
         "No `username` or `password` found in section `peloton` "
@@ -135,10 +173,91 @@ class PelotonRedirectError(PelotonException):
         self.response = response
 
 
+class LazyAttribute:
+    """ Descriptor for attributes that are lazy loaded the first time they're
+        accessed, by calling the named loader method on the instance
+
+    The value itself lives in `_<name>` (a NotLoaded() instance until it
+    has been loaded). Only lazy attributes pay for this, everything else
+    on our objects is a plain attribute
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.attr = '_' + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        value = getattr(instance, self.attr)
+        if type(value) is NotLoaded:
+            getattr(instance, self.loader)()
+            value = getattr(instance, self.attr)
+
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.attr, value)
+
+
 class PelotonObject:
     """ Base class for all Peloton data
+
+    Subclasses that we hold on to a lot of (eg: workouts) declare their
+    attributes in __slots__, to keep them compact
     """
 
+    __slots__ = ()
+
+    def _field_names(self):
+        """ Names of our public attributes, lazy loaded or not
+        """
+
+        cls = type(self)
+        if hasattr(self, '__dict__'):
+            names = list(self.__dict__)
+        else:
+            names = [
+                k for klass in reversed(cls.__mro__)
+                for k in getattr(klass, '__slots__', ()) if hasattr(self, k)]
+
+        for k in names:
+            if not k.startswith('_'):
+                yield k
+
+            # Lazy loaded attributes keep their value in _<name>
+            elif isinstance(getattr(cls, k[1:], None), LazyAttribute):
+                yield k[1:]
+
+    def _raw_value(self, attr):
+        """ Return the value of attr, without lazy loading it
+        """
+
+        descriptor = getattr(type(self), attr, None)
+        if isinstance(descriptor, LazyAttribute):
+            return getattr(self, descriptor.attr)
+
+        return getattr(self, attr)
+
+    def _not_loaded(self, attr):
+        """ Whether or not attr is still waiting to be lazy loaded
+        """
+        return type(self._raw_value(attr)) is NotLoaded
+
+    def _merge(self, other):
+        """ Take on everything that other (a fresher copy of the same
+            object) has loaded, keeping anything we've loaded that it hasn't
+        """
+
+        for k in other._field_names():
+            value = other._raw_value(k)
+            if type(value) is not NotLoaded:
+                setattr(self, k, value)
+
     def serialize(self, depth=1, load_all=True):
         """Ensures that everything has a .serialize() method
            so that all data is serializable
@@ -159,34 +278,24 @@ class PelotonObject:
         if depth == 0:
             return None
 
-        # List of keys that we will not be included in our serializable
-        # output based on load_all
-        dont_load = []
-
         # Load our NotLoaded() (lazy loading) instances if we're
-        # requesting to do so
-        for k in self.__dict__:
-            if load_all:
+        # requesting to do so, otherwise leave them out entirely
+        for k in self._field_names():
+            if load_all or not self._not_loaded(k):
                 obj_attrs[k] = getattr(self, k)
-                continue
-
-            # Don't include lazy loaded attrs
-            raw_value = super(PelotonObject, self).__getattribute__(k)
-            if isinstance(raw_value, NotLoaded):
-                dont_load.append(k)
 
         # We've gone through our pre-flight prep, now lets actually
         # serialize our data
         for k, v in obj_attrs.items():
 
-            # Ignore this key if it's in our dont_load list or is private
-            if k.startswith('_') or k in dont_load:
-                continue
-
             if isinstance(v, PelotonObject):
                 if depth > 1:
                     ret[k] = v.serialize(depth=depth - 1)
 
+            # Metric series, hand back plain lists (with gaps as None)
+            elif isinstance(v, array):
+                ret[k] = [None if val != val else val for val in v]
+
             elif isinstance(v, list):
                 serialized_list = []
 
@@ -229,11 +338,358 @@ class PelotonObject:
         return ret
 
 
+class PelotonCache:
+    """ A persistent, SQLite backed cache of raw API responses
+
+    Entries expire `ttl` seconds after they're written, unless they're
+    stored as permanent (eg: a workout that has been completed, which will
+    never change again). Once the cache grows past `max_size` bytes, the
+    least recently used entries are evicted, permanent or not.
+
+    Safe to share between threads (and processes, courtesy of SQLite)
+    """
+
+    def __init__(self, path="~/.cache/peloton/responses.sqlite", ttl=3600,
+                 max_size=512 * 1024 * 1024):
+
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_size = max_size
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, body BLOB NOT NULL, "
+            "size INTEGER NOT NULL, expires REAL, accessed REAL NOT NULL)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed "
+            "ON responses (accessed)")
+
+        # Running total of our size, so we don't need to sum up the
+        # whole table on every write
+        self._size = self._total_size()
+
+    @staticmethod
+    def key(uri, params=None):
+        """ Build a cache key out of a uri and its query parameters
+        """
+
+        if not params:
+            return uri
+
+        return "{}?{}".format(uri, urlencode(sorted(params.items())))
+
+    def get(self, key):
+        """ Return the cached body for key, or None if we don't have
+            one (or it has expired)
+        """
+
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, expires FROM responses WHERE key = ?",
+                (key,)).fetchone()
+
+            if row is None:
+                return None
+
+            body, expires = row
+            if expires is not None and expires <= now:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= len(body)
+                return None
+
+            self._db.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?",
+                (now, key))
+
+        return body
+
+    def set(self, key, body, permanent=False):
+        """ Store a response body under key. Permanent entries never
+            expire, but are still subject to size based eviction
+        """
+
+        now = time.time()
+        expires = None if permanent else now + self.ttl
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, body, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, body, len(body), expires, now))
+            self._size += len(body) - (row[0] if row else 0)
+
+            if self._size > self.max_size:
+                self._evict(now)
+
+    def invalidate(self, key):
+        """ Forget a single cached response
+        """
+
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size = self._total_size()
+
+    def clear(self):
+        """ Forget everything
+        """
+
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._size = 0
+
+    def close(self):
+        self._db.close()
+
+    def __reduce__(self):
+        # Other processes open the same file for themselves
+        return (type(self), (self.path, self.ttl, self.max_size))
+
+    def _total_size(self):
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self, now):
+        """ Drop expired entries, and then the least recently used ones
+            until we're back under max_size. Expects self._lock to be held
+        """
+
+        self._db.execute(
+            "DELETE FROM responses WHERE expires <= ?", (now,))
+
+        # Other processes may share this file, so start from the truth
+        excess = self._total_size() - self.max_size
+        if excess > 0:
+            evict = []
+            for key, size in self._db.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed"):
+                evict.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+
+            self._db.executemany(
+                "DELETE FROM responses WHERE key = ?", evict)
+
+        self._size = self._total_size()
+
+
+class PelotonLRUCache:
+    """ A bounded, in-memory LRU of the objects our factories build, keyed
+        by workout id (eg: a workouts details and its metrics share a slot)
+
+    Safe to share between threads. Keeps hit/miss counters, see stats()
+    """
+
+    def __init__(self, max_size=128):
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, workout_id, kind):
+        """ Return the cached `kind` object for workout_id, or None
+        """
+
+        with self._lock:
+            value = self._entries.get(workout_id, {}).get(kind)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(workout_id)
+            return value
+
+    def set(self, workout_id, kind, value):
+        """ Cache a `kind` object for workout_id, evicting the least
+            recently used workout(s) if we're full
+        """
+
+        with self._lock:
+            self._entries.setdefault(workout_id, {})[kind] = value
+            self._entries.move_to_end(workout_id)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, workout_id=None):
+        """ Forget everything about a workout, or about every workout if
+            none is given
+        """
+
+        with self._lock:
+            if workout_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(workout_id, None)
+
+    def stats(self):
+        """ Return our hit/miss counters, along with how many workouts
+            we're currently holding on to
+        """
+
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+    def __reduce__(self):
+        # Objects we've handed out stay behind in this process
+        return (type(self), (self.max_size,))
+
+
+class PelotonIdentityMap:
+    """ Hands out a single, shared object per id (eg: the ride that 300 of
+        your workouts were taken in), rather than one copy per occurrence
+
+    Objects are only held on to for as long as something else references
+    them. Safe to share between threads
+    """
+
+    def __init__(self):
+        self._objects = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def intern(self, key, factory, **kwargs):
+        """ Return the object we hold for key, building it with
+            factory(**kwargs) if we don't have one yet
+        """
+
+        # Can't share what we can't identify
+        if key is None:
+            return factory(**kwargs)
+
+        with self._lock:
+            obj = self._objects.get(key)
+            if obj is None:
+                obj = factory(**kwargs)
+                self._objects[key] = obj
+
+            return obj
+
+    def merge(self, key, factory, **kwargs):
+        """ Like intern(), but if we already hold an object for key, the
+            newly built one is merged into it (see PelotonObject._merge)
+        """
+
+        obj = factory(**kwargs)
+        if key is None:
+            return obj
+
+        with self._lock:
+            existing = self._objects.get(key)
+            if existing is None:
+                self._objects[key] = obj
+                return obj
+
+            existing._merge(obj)
+            return existing
+
+    def get(self, key):
+        """ Return the object we hold for key, if any
+        """
+        return self._objects.get(key)
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __reduce__(self):
+        return (type(self), ())
+
+
+class PelotonRateLimiter:
+    """ Token bucket rate limiter, shared by everything that makes requests
+        through PelotonAPI (across threads)
+
+    Allows `rate` requests per second on average, with bursts of up to
+    `burst` requests. pause() holds everyone back for a while, which is
+    how we honour a Retry-After from the API
+    """
+
+    def __init__(self, rate, burst=1):
+
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Block until we're allowed to make a request
+        """
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+
+                    wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """ Don't hand out anything for the next `seconds` seconds
+        """
+
+        with self._lock:
+            self._paused_until = max(
+                self._paused_until, time.monotonic() + seconds)
+
+    def __reduce__(self):
+        # A copy in another process limits that process alone
+        return (type(self), (self.rate, self.burst))
+
+
 class PelotonAPI:
-    """ Base class that factory classes within this module inherit from.
-    This class is _not_ meant to be utilized directly, so don't do it.
+    """ Core "working" class of the Peolton API Module
 
-    Core "working" class of the Peolton API Module
+    A client for a single Peloton account. It owns its logged in session,
+    user ID, memo of recently fetched workouts and retry counters, and
+    anything it's given as an option (eg: a rate_limiter, cache or
+    max_workers). Everything else falls back to the class attributes below.
+
+        client = PelotonAPI("username", "password", rate_limiter=...)
+        workouts = PelotonWorkout.list(client=client)
+
+    Objects are tied to the client that fetched them, so lazy loading
+    goes through it too. Clients can be handed to other processes (eg:
+    through a ProcessPoolExecutor), taking their session along with them.
+
+    The class level API (eg: PelotonWorkout.list()) uses default(), a
+    client that keeps its state on this class, as it always has
     """
 
     peloton_username = None
@@ -250,14 +706,141 @@ class PelotonAPI:
     # Hold our user ID (pulled when we authenticate to the API)
     user_id = None
 
+    # Number of pages to fetch concurrently when listing workouts. Leave
+    # this at 1 (sequential, like the web UI) unless you need the speed
+    max_workers = 1
+
+    # Number of requests PelotonWorkout.prefetch() makes concurrently
+    prefetch_workers = 4
+
+    # Optional PelotonCache instance. When set, responses that don't
+    # change (eg: a finished workout) are served from disk
+    cache = None
+
+    # Workouts (and their metrics) we've recently fetched, so that asking
+    # again is free. Set to None to disable
+    memo = PelotonLRUCache()
+
+    # Rides and instructors are shared by every workout that refers to
+    # them, rather than copied into each one
+    rides = PelotonIdentityMap()
+    instructors = PelotonIdentityMap()
+
+    # Likewise, however we come across a workout (list, get, latest..) we
+    # hand out the same object, so anything lazy loaded is loaded just once
+    workouts = PelotonIdentityMap()
+
+    # Optional PelotonRateLimiter instance, shared by every client (and
+    # thread) making requests, unless a client is given its own
+    rate_limiter = None
+
+    # How many times (and how patiently) to retry requests that failed
+    # with a connection error or one of retry_statuses. Waits are jittered
+    # exponential backoff (backoff_factor * 2^attempt seconds, at most
+    # backoff_max), unless the API tells us how long via Retry-After. If
+    # that's longer than backoff_max, the request fails straight away
+    max_retries = 3
+    backoff_factor = 0.5
+    backoff_max = 30
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    # Number of retries we've made so far, across all of a clients requests
+    retry_count = 0
+    _retry_lock = threading.Lock()
+
+    # Resolution (one sample every_n seconds) of the metrics we load, and
+    # whether or not to only load their summaries (calories, distance..)
+    metrics_every_n = 1
+    metrics_summaries_only = False
+
     # Headers we'll be using for each request
     headers = {
         "Content-Type": "application/json",
         "User-Agent": _USER_AGENT
     }
 
-    @classmethod
-    def _api_request(cls, uri, params={}):
+    # Connection pooling for our session. pool_maxsize caps how many
+    # connections to the API we keep open, so raise it along with
+    # max_workers if you make lots of requests at once
+    pool_connections = 1
+    pool_maxsize = 10
+    keep_alive = True
+
+    # Ask for compressed responses (set to None to not ask)
+    accept_encoding = "gzip, deflate"
+
+    # Makes sure that only one thread logs in, however many need a session
+    _session_lock = threading.RLock()
+
+    # Optional file to save our logged in session (cookies and user ID)
+    # to, and to pick it back up from in new processes
+    session_path = None
+
+    # Attributes that belong to one client and can't be passed as options
+    _client_state = (
+        'peloton_session', 'user_id', 'workouts', 'retry_count',
+        'rides', 'instructors')
+
+    def __init__(self, username=None, password=None, **options):
+        """ Create a client for the given account (or the one in our
+            config file, if not given)
+
+        Args:
+            options: any of our class attributes (eg: max_workers,
+                     rate_limiter, cache, memo, session_path), for this
+                     client only
+        """
+
+        for name in options:
+            if name.startswith('_') or name in self._client_state or \
+                    callable(getattr(PelotonAPI, name, len)):
+                raise TypeError("Unknown PelotonAPI option {}".format(name))
+
+        self.peloton_username = username
+        self.peloton_password = password
+
+        self.peloton_session = None
+        self.user_id = None
+
+        # Our own memo and workouts (which refer back to us for lazy
+        # loading). Rides and instructors are the same for every account,
+        # so those stay shared
+        self.memo = PelotonLRUCache()
+        self.workouts = PelotonIdentityMap()
+
+        self.retry_count = 0
+        self._retry_lock = threading.Lock()
+        self._session_lock = threading.RLock()
+
+        # A session file holds a single account, so only use one if
+        # we're told to
+        self.session_path = None
+
+        for name, value in options.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return "<{} {}>".format(
+            type(self).__name__, self.peloton_username or PELOTON_USERNAME)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_retry_lock']
+        del state['_session_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._retry_lock = threading.Lock()
+        self._session_lock = threading.RLock()
+
+    @staticmethod
+    def default():
+        """ Return the client used by the class level API
+        """
+        return _DEFAULT_CLIENT
+
+    def _api_request(self, uri, params={}):
         """ Base function that everything will use under the hood to
             interact with the API
 
@@ -265,14 +848,62 @@ class PelotonAPI:
         """
 
         # Create a session if we don't have one yet
-        if cls.peloton_session is None:
-            cls._create_api_session()
+        if self.peloton_session is None:
+            self._ensure_api_session()
+
+        attempt = 0
+        reauthenticated = False
+        while True:
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            get_logger().debug(
+                "Request {} [{}]".format(_BASE_URL + uri, params))
+            session = self.peloton_session
+            try:
+                resp = session.get(
+                    _BASE_URL + uri, headers=self.headers, params=params)
+
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if attempt >= self.max_retries:
+                    raise
+
+                get_logger().warning("Request {} failed: {}".format(
+                    _BASE_URL + uri, error))
+                self._retry_wait(attempt)
+                attempt += 1
+                continue
+
+            get_logger().debug("Response {}: [{}]".format(
+                resp.status_code, resp._content))
+
+            # Our session has expired (or a saved one was stale), log in
+            # again and give it one more go
+            if resp.status_code == 401 and not reauthenticated:
+                get_logger().warning("Session expired, logging in again")
+                self._reauthenticate(session)
+                reauthenticated = True
+                continue
+
+            if resp.status_code not in self.retry_statuses or \
+                    attempt >= self.max_retries:
+                break
+
+            # Rather than hold up this thread (and, through the rate limiter,
+            # every other one) for longer than we'd ever back off for, give up
+            retry_after = self._retry_after(resp)
+            if retry_after is not None and retry_after > self.backoff_max:
+                get_logger().warning(
+                    "Request {} failed with {}, asked to retry in {:.0f}s "
+                    "(more than backoff_max), giving up".format(
+                        _BASE_URL + uri, resp.status_code, retry_after))
+                break
 
-        get_logger().debug("Request {} [{}]".format(_BASE_URL + uri, params))
-        resp = cls.peloton_session.get(
-            _BASE_URL + uri, headers=cls.headers, params=params)
-        get_logger().debug("Response {}: [{}]".format(
-            resp.status_code, resp._content))
+            get_logger().warning("Request {} failed with {}, retrying".format(
+                _BASE_URL + uri, resp.status_code))
+            self._retry_wait(attempt, retry_after)
+            attempt += 1
 
         # If we don't have a 200 code
         if not (200 >= resp.status_code < 300):
@@ -290,44 +921,264 @@ class PelotonAPI:
 
         return resp
 
-    @classmethod
-    def _create_api_session(cls):
+    def _retry_wait(self, attempt, retry_after=None):
+        """ Wait before retrying a request for the attempt'th time
+        """
+
+        with self._retry_lock:
+            self.retry_count += 1
+
+        # The API told us how long to back off for, so make everyone wait
+        if retry_after is not None:
+            if self.rate_limiter is not None:
+                self.rate_limiter.pause(retry_after)
+            time.sleep(retry_after)
+            return
+
+        # Otherwise, exponential backoff with (full) jitter
+        time.sleep(random.uniform(0, min(
+            self.backoff_max, self.backoff_factor * 2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(resp):
+        """ Return the number of seconds a Retry-After header asks us to
+            wait for, if there is one
+        """
+
+        value = resp.headers.get('Retry-After')
+        if value is None:
+            return None
+
+        try:
+            return max(0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            when = parsedate_to_datetime(value)
+            return max(0, (when - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def _cached_api_request(self, uri, params={}, permanent=False,
+                            refresh=False):
+        """ Like _api_request, but returns the decoded json and goes
+            through self.cache (if there is one)
+
+        Args:
+            permanent: whether the response can be cached forever. May be
+                       a callable, which is handed the decoded json
+            refresh: skip the cached copy, fetching (and caching) a
+                     fresh one
+        """
+
+        cache = self.cache
+        if cache is None:
+            return self._api_request(uri, params).json()
+
+        key = cache.key(uri, params)
+        if not refresh:
+            body = cache.get(key)
+            if body is not None:
+                get_logger().debug("Cached {}".format(key))
+                return json.loads(body)
+
+        resp = self._api_request(uri, params)
+        data = resp.json()
+
+        if callable(permanent):
+            permanent = permanent(data)
+
+        cache.set(key, resp.content, permanent=permanent)
+        return data
+
+    def _ensure_api_session(self):
+        """ Create a session instance for communicating with the API, unless
+            we already have one (or another thread is busy creating it)
+        """
+
+        if self.peloton_session is not None and \
+                self.user_id is not None:
+            return
+
+        with self._session_lock:
+            if self.peloton_session is None or \
+                    self.user_id is None:
+
+                if not self._load_saved_session():
+                    self._create_api_session()
+
+    def _reauthenticate(self, stale_session):
+        """ Log in again, unless another thread already has since
+            stale_session was rejected
+        """
+
+        with self._session_lock:
+            if self.peloton_session is stale_session:
+                self._create_api_session()
+
+    def _create_api_session(self):
         """ Create a session instance for communicating with the API
+
+        The session (and our user ID) are shared by every thread using
+        this client
         """
 
-        if cls.peloton_username is None:
-            cls.peloton_username = PELOTON_USERNAME
+        with self._session_lock:
+
+            if self.peloton_username is None:
+                self.peloton_username = PELOTON_USERNAME
+
+            if self.peloton_password is None:
+                self.peloton_password = PELOTON_PASSWORD
+
+            if self.peloton_username is None or self.peloton_password is None:
+                raise PelotonClientError(
+                    "The Peloton Client Library requires a `username` "
+                    "and `password` be set in "
+                    "`/.config/peloton, under section `peloton`", None)
+
+            payload = {
+                'username_or_email': self.peloton_username,
+                'password': self.peloton_password
+            }
+
+            session = self._new_session()
+            resp = session.post(
+                _BASE_URL + '/auth/login', json=payload, headers=self.headers)
+            message = resp._content
+
+            if 300 <= resp.status_code < 400:
+                raise PelotonRedirectError("Unexpected Redirect", resp)
+
+            elif 400 <= resp.status_code < 500:
+                raise PelotonClientError(message, resp)
+
+            elif 500 <= resp.status_code < 600:
+                raise PelotonServerError(message, resp)
+
+            # Set our User ID (and session) where every thread can see it
+            self.user_id = resp.json()['user_id']
+            self.peloton_session = session
 
-        if cls.peloton_password is None:
-            cls.peloton_password = PELOTON_PASSWORD
+            self._save_session()
 
-        if cls.peloton_username is None or cls.peloton_password is None:
-            raise PelotonClientError(
-                "The Peloton Client Library requires a `username` "
-                "and `password` be set in "
-                "`/.config/peloton, under section `peloton`")
+    def _session_file(self):
+        path = self.session_path
+        if path:
+            return os.path.expanduser(path)
 
-        payload = {
-            'username_or_email': cls.peloton_username,
-            'password': cls.peloton_password
+    def _save_session(self):
+        """ Save our session cookies and User ID to session_path (if set),
+            readable and writable by the current user only
+        """
+
+        path = self._session_file()
+        if path is None:
+            return
+
+        state = {
+            'username': self.peloton_username,
+            'user_id': self.user_id,
+            'cookies': [{
+                'name': cookie.name,
+                'value': cookie.value,
+                'domain': cookie.domain,
+                'path': cookie.path,
+                'expires': cookie.expires,
+                'secure': cookie.secure
+            } for cookie in self.peloton_session.cookies]
         }
 
-        cls.peloton_session = requests.Session()
-        resp = cls.peloton_session.post(
-            _BASE_URL + '/auth/login', json=payload, headers=cls.headers)
-        message = resp._content
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+
+            # Write it out under a temporary name first, so that nobody
+            # ever reads half a file
+            tmp_path = "{}.{}.tmp".format(path, os.getpid())
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0o600)
+            with os.fdopen(fd, 'w') as session_file:
+                json.dump(state, session_file)
+            os.replace(tmp_path, path)
+
+        except OSError as error:
+            get_logger().warning(
+                "Unable to save session to {}: {}".format(path, error))
+
+    def _load_saved_session(self):
+        """ Pick up a session saved by _save_session (for the same user),
+            returning whether or not we found one
+
+        We don't check that it's still valid, a 401 will have us log in
+        again (see _api_request)
+        """
+
+        path = self._session_file()
+        if path is None or not os.path.exists(path):
+            return False
+
+        if self.peloton_username is None:
+            self.peloton_username = PELOTON_USERNAME
+
+        try:
+            with open(path) as session_file:
+                state = json.load(session_file)
+
+            if state.get('username') != self.peloton_username or \
+                    not state.get('user_id'):
+                return False
+
+            session = self._new_session()
+            for cookie in state['cookies']:
+                session.cookies.set(**cookie)
+
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            get_logger().warning(
+                "Ignoring saved session in {}: {}".format(path, error))
+            return False
+
+        self.user_id = state['user_id']
+        self.peloton_session = session
+        return True
+
+    def _new_session(self):
+        """ Build a requests.Session with our connection pool settings
+        """
+
+        session = requests.Session()
+
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+
+        if self.accept_encoding:
+            session.headers['Accept-Encoding'] = self.accept_encoding
+
+        return session
+
 
-        if 300 <= resp.status_code < 400:
-            raise PelotonRedirectError("Unexpected Redirect", resp)
+class _PelotonDefaultAPI(PelotonAPI):
+    """ The client behind the class level API. Its state (session, user ID,
+        memo..) lives on PelotonAPI itself, so PelotonAPI.user_id and
+        friends keep meaning what they always have
+    """
 
-        elif 400 <= resp.status_code < 500:
-            raise PelotonClientError(message, resp)
+    def __init__(self):
+        pass
 
-        elif 500 <= resp.status_code < 600:
-            raise PelotonServerError(message, resp)
+    def __setattr__(self, name, value):
+        setattr(PelotonAPI, name, value)
 
-        # Set our User ID on our class
-        cls.user_id = resp.json()['user_id']
+    def __reduce__(self):
+        return (PelotonAPI.default, ())
 
 
 class PelotonUser(PelotonObject):
@@ -353,6 +1204,12 @@ class PelotonWorkout(PelotonObject):
     This class should never be instantiated directly!
     """
 
+    __slots__ = (
+        'id', '_ride', 'created', 'created_at', 'start_time', 'end_time',
+        'fitness_discipline', 'status', 'metrics_type', '_metrics',
+        '_leaderboard_rank', '_leaderboard_users', '_personal_record',
+        '_achievements', '_client', '__weakref__')
+
     def __init__(self, **kwargs):
         """ This class is instantiated by
         PelotonWorkout.get()
@@ -361,11 +1218,17 @@ class PelotonWorkout(PelotonObject):
 
         self.id = kwargs.get('id')
 
+        # The PelotonAPI client we were fetched through (and lazy load
+        # through), None for the default one
+        self._client = kwargs.get('client')
+
         # This is a bit weird, we can only get ride details if they
-        # come up from a users workout list via a join
+        # come up via a join (see PelotonWorkoutFactory)
         self.ride = NotLoaded()
-        if kwargs.get('ride') is not None:
-            self.ride = PelotonRide(**kwargs.get('ride'))
+        ride = kwargs.get('ride')
+        if ride is not None:
+            self.ride = PelotonAPI.rides.intern(
+                ride.get('id'), PelotonRide, **ride)
 
         # Not entirely certain what the difference is between these two fields
         self.created = datetime.fromtimestamp(
@@ -400,66 +1263,107 @@ class PelotonWorkout(PelotonObject):
         # List of achievements that were obtained during this workout
         achievements = kwargs.get('achievement_templates', NotLoaded())
         if not isinstance(achievements, NotLoaded):
-            self.achievements = []
-            for achievement in achievements:
-                self.achievements.append(
-                    PelotonWorkoutAchievement(**achievement))
+            achievements = [PelotonWorkoutAchievement(**achievement)
+                            for achievement in achievements]
+        self.achievements = achievements
 
     def __str__(self):
         return self.fitness_discipline
 
-    def __getattribute__(self, attr):
-
-        value = object.__getattribute__(self, attr)
+    # Lazy loaded attributes (yay lazy loading), see LazyAttribute
+    ride = LazyAttribute('_load_details')
+    metrics = LazyAttribute('_load_metrics')
+    leaderboard_rank = LazyAttribute('_load_details')
+    leaderboard_users = LazyAttribute('_load_details')
+    personal_record = LazyAttribute('_load_details')
+    achievements = LazyAttribute('_load_details')
+
+    def _load_details(self):
+        """ Load leaderboard stats, achievements and (if we don't have it
+            yet) our ride, which only come back from the workout details
+            endpoint
+        """
 
-        # Handle accessing NotLoaded attributes (yay lazy loading)
-        #   TODO: Handle ride laoding if its NotLoaded()
-        if attr in ['leaderboard_rank', 'leaderboard_users',
-                    'achievements', 'metrics'] and type(value) is NotLoaded:
+        # Yes, this gets a bunch of duplicate date, but the
+        # endpoints don't return consistent info!
+        workout = PelotonWorkoutFactory.get(self.id, client=self._client)
 
-            if attr.startswith('leaderboard_') or attr == 'achievements':\
+        # Anything the details don't have either is simply missing,
+        # don't go back for it every time it's accessed
+        for attr in ['ride', 'leaderboard_rank', 'leaderboard_users',
+                     'personal_record', 'achievements']:
+            if not self._not_loaded(attr):
+                continue
 
-                # Yes, this gets a bunch of duplicate date, but the
-                # endpoints don't return consistent info!
-                workout = PelotonWorkoutFactory.get(self.id)
+            value = workout._raw_value(attr)
+            if type(value) is NotLoaded:
+                value = None
+            setattr(self, attr, value)
 
-                # Load leaderboard stats
-                self.leaderboard_rank = workout.leaderboard_rank
-                self.leaderboard_users = workout.leaderboard_users
-                self.personal_record = workout.personal_record
+    def _load_metrics(self, every_n=None, summaries_only=None):
+        """ Load our metrics from the performance graph endpoint
+        """
 
-                # Load our achievements
-                self.achievements = workout.achievements
+        self.metrics = PelotonWorkoutMetricsFactory.get(
+            self.id, every_n=every_n, summaries_only=summaries_only,
+            complete=self.status == 'COMPLETE', client=self._client)
 
-                # Return the value of the requested attribute
-                return getattr(self, attr)
+    def load_metrics(self, every_n=None, summaries_only=None):
+        """ (Re)load our metrics at a given resolution, rather than the
+            defaults lazy loading uses (see PelotonAPI.metrics_every_n
+            and PelotonAPI.metrics_summaries_only)
 
-            # Metrics gets a dedicated conditional because it's a
-            # different endpoint
-            elif attr == "metrics":
-                metrics = PelotonWorkoutMetricsFactory.get(self.id)
-                self.metrics = metrics
-                return metrics
+        Args:
+            every_n: one sample every `every_n` seconds
+            summaries_only: only load summaries, without any time series
+        """
 
-        return value
+        self._load_metrics(every_n=every_n, summaries_only=summaries_only)
+        return self.metrics
 
     @classmethod
-    def get(cls, workout_id):
+    def get(cls, workout_id, refresh=False, client=None):
         """ Get a specific workout
         """
-        return PelotonWorkoutFactory.get(workout_id)
+        return PelotonWorkoutFactory.get(
+            workout_id, refresh=refresh, client=client)
 
     @classmethod
-    def list(cls):
+    def list(cls, max_workers=None, client=None):
         """ Return a list of all workouts
         """
-        return PelotonWorkoutFactory.list()
+        return PelotonWorkoutFactory.list(
+            max_workers=max_workers, client=client)
+
+    @classmethod
+    def iter(cls, read_ahead=True, since=None, client=None):
+        """ Iterate over all workouts (newer than `since`), a page at a time
+        """
+        return PelotonWorkoutFactory.iter(
+            read_ahead=read_ahead, since=since, client=client)
+
+    @classmethod
+    def list_since(cls, since=None, client=None):
+        """ Return a list of workouts newer than `since`, and the new
+            watermark
+        """
+        return PelotonWorkoutFactory.list_since(since, client=client)
+
+    @classmethod
+    def prefetch(cls, workouts, fields=("metrics", "leaderboard"),
+                 max_workers=None, every_n=None, summaries_only=None,
+                 client=None):
+        """ Load lazy loaded attributes for many workouts at once
+        """
+        return PelotonWorkoutFactory.prefetch(
+            workouts, fields=fields, max_workers=max_workers,
+            every_n=every_n, summaries_only=summaries_only, client=client)
 
     @classmethod
-    def latest(cls):
+    def latest(cls, client=None):
         """ Returns the lastest workout object
         """
-        return PelotonWorkoutFactory.latest()
+        return PelotonWorkoutFactory.latest(client=client)
 
 
 class PelotonRide(PelotonObject):
@@ -468,6 +1372,10 @@ class PelotonRide(PelotonObject):
     This class should never be invoked directly!
     """
 
+    __slots__ = (
+        'title', 'id', 'description', 'duration', 'instructor',
+        '__weakref__')
+
     def __init__(self, **kwargs):
 
         self.title = kwargs.get('title')
@@ -477,8 +1385,10 @@ class PelotonRide(PelotonObject):
 
         # When we make this Ride call from the workout factory, there
         # is no instructor data
-        if kwargs.get('instructor') is not None:
-            self.instructor = PelotonInstructor(**kwargs.get('instructor'))
+        instructor = kwargs.get('instructor')
+        if instructor is not None:
+            self.instructor = PelotonAPI.instructors.intern(
+                instructor.get('id'), PelotonInstructor, **instructor)
 
     def __str__(self):
         return self.title
@@ -493,9 +1403,16 @@ class PelotonMetric(PelotonObject):
         about the workout
     """
 
+    __slots__ = ('values', 'average', 'name', 'unit', 'max', 'slug')
+
     def __init__(self, **kwargs):
 
-        self.values = kwargs.get('values')
+        # Samples are kept in a compact array of doubles rather than a list
+        # of python numbers. Gaps in the data (eg: a h/r monitor dropping
+        # out) are NaN
+        self.values = array('d', [
+            _NAN if value is None else value
+            for value in kwargs.get('values') or []])
         self.average = kwargs.get('average_value')
         self.name = kwargs.get('display_name')
         self.unit = kwargs.get('display_unit')
@@ -505,11 +1422,24 @@ class PelotonMetric(PelotonObject):
     def __str__(self):
         return "{} ({})".format(self.name, self.unit)
 
+    def __len__(self):
+        return len(self.values)
+
+    def to_numpy(self):
+        """ Return our values as a numpy array (float64, sharing memory
+            with .values rather than copying it). Requires numpy
+        """
+
+        import numpy
+        return numpy.frombuffer(self.values, dtype=numpy.float64)
+
 
 class PelotonMetricSummary(PelotonObject):
     """ An object that describes a summary of a metric set
     """
 
+    __slots__ = ('name', 'value', 'unit', 'slug')
+
     def __init__(self, **kwargs):
 
         self.name = kwargs.get('display_name')
@@ -527,11 +1457,17 @@ class PelotonWorkoutMetrics(PelotonObject):
 
     def __init__(self, **kwargs):
         """ Take a metrics set and objectify it
+
+        Pass summaries_only=True to skip building the metric series
         """
 
         self.workout_duration = kwargs.get('duration')
         self.fitness_discipline = kwargs.get('segment_list')[0]['metrics_type']
 
+        # Time axis shared by all of our metrics, in seconds
+        self.seconds = array(
+            'i', kwargs.get('seconds_since_pedaling_start') or [])
+
         # Build summary attributes
         metric_summaries = ['total_output', 'distance', 'calories']
         for metric in kwargs.get('summaries'):
@@ -549,6 +1485,13 @@ class PelotonWorkoutMetrics(PelotonObject):
         # Build metric details
         metric_categories = [
             'output', 'cadence', 'resistance', 'speed', 'heart_rate']
+        self.metric_slugs = []
+
+        # We were only asked for the summaries, don't bother with the rest
+        if kwargs.get('summaries_only'):
+            self.seconds = array('i')
+            return
+
         for metric in kwargs.get('metrics'):
 
             if metric['slug'] not in metric_categories:
@@ -557,18 +1500,49 @@ class PelotonWorkoutMetrics(PelotonObject):
                 continue
 
             setattr(self, metric['slug'], PelotonMetric(**metric))
+            self.metric_slugs.append(metric['slug'])
 
     def __str__(self):
         return self.fitness_discipline
 
+    def to_numpy(self, slugs=None):
+        """ Return our metrics as a 2d numpy array, one row per sample and
+            one column per metric (see metric_slugs for the default column
+            order). Metrics shorter than the others are padded with NaN.
+            Requires numpy
+
+        Args:
+            slugs: list of metric slugs to include, in column order
+        """
+
+        import numpy
+
+        if slugs is None:
+            slugs = self.metric_slugs
+
+        columns = [getattr(self, slug).to_numpy() for slug in slugs]
+        rows = max([len(self.seconds)] + [len(col) for col in columns])
+
+        matrix = numpy.full((rows, len(columns)), numpy.nan)
+        for index, column in enumerate(columns):
+            matrix[:len(column), index] = column
+
+        return matrix
+
 
 class PelotonInstructor(PelotonObject):
     """ A read-only class that outlines instructor details
 
     This class should never be invoked directly"""
 
+    __slots__ = (
+        'id', 'name', 'first_name', 'last_name', 'music_bio',
+        'spotify_playlist_uri', 'bio', 'quote', 'background', 'short_bio',
+        '__weakref__')
+
     def __init__(self, **kwargs):
 
+        self.id = kwargs.get('id')
         self.name = kwargs.get('name')
         self.first_name = kwargs.get('first_name')
         self.last_name = kwargs.get('last_name')
@@ -597,6 +1571,8 @@ class PelotonWorkoutAchievement(PelotonObject):
         earned during the workout
     """
 
+    __slots__ = ('slug', 'description', 'image_url', 'id', 'name')
+
     def __init__(self, **kwargs):
 
         self.slug = kwargs.get('slug')
@@ -606,93 +1582,408 @@ class PelotonWorkoutAchievement(PelotonObject):
         self.name = kwargs.get('name')
 
 
-class PelotonWorkoutFactory(PelotonAPI):
+class PelotonWorkoutFactory:
     """ Class that handles fetching data and instantiating objects
 
+    Every method takes an optional `client` (a PelotonAPI instance) to
+    fetch through, defaulting to PelotonAPI.default()
+
     See PelotonWorkout for details
     """
 
     @classmethod
-    def list(cls, results_per_page=10):
+    def list(cls, results_per_page=10, max_workers=None, client=None):
         """ Return a list of PelotonWorkout instances that describe
             each workout
+
+        Args:
+            results_per_page: number of workouts to request per page
+            max_workers: number of pages to fetch concurrently once the
+                         first page (and with it, page_count) is known.
+                         Defaults to the clients max_workers
+        """
+
+        client = client or PelotonAPI.default()
+        if max_workers is None:
+            max_workers = client.max_workers
+
+        # We need a user ID to list all workouts. @pelotoncycle, please
+        # don't do this :(
+        if client.user_id is None:
+            client._ensure_api_session()
+
+        # Get our first page, which includes number of successive pages
+        res = cls._workouts_page(0, results_per_page, client)
+
+        # Add this pages data to our return list
+        ret = [cls._workout(workout, client) for workout in res['data']]
+
+        # We've got page 0, so start with page 1
+        pages = range(1, res['page_count'])
+        if max_workers > 1 and len(pages) > 1:
+            results = cls._workouts_pages(
+                pages, results_per_page, max_workers, client)
+        else:
+            results = (cls._workouts_page(page, results_per_page, client)
+                       for page in pages)
+
+        for res in results:
+            ret.extend(
+                cls._workout(workout, client) for workout in res['data'])
+
+        return ret
+
+    @classmethod
+    def iter(cls, results_per_page=10, read_ahead=True, since=None,
+             client=None):
+        """ Iterate over PelotonWorkout instances that describe each
+            workout, without holding the whole history in memory
+
+        Args:
+            results_per_page: number of workouts to request per page
+            read_ahead: fetch the next page in the background while
+                        the current one is being consumed
+            since: watermark of already known workouts, either a
+                   created_at datetime (or epoch timestamp) or the id of
+                   the newest known workout. Iteration (and paging) stops
+                   as soon as we reach it
         """
 
+        client = client or PelotonAPI.default()
+
         # We need a user ID to list all workouts. @pelotoncycle, please
         # don't do this :(
-        if cls.user_id is None:
-            cls._create_api_session()
+        if client.user_id is None:
+            client._ensure_api_session()
+
+        pool = None
+        if read_ahead:
+            pool = concurrent.futures.ThreadPoolExecutor(1)
+
+        upcoming = None
+        try:
+            # Get our first page, which includes number of successive pages
+            res = cls._workouts_page(0, results_per_page, client)
+            page = 1
+
+            while True:
+
+                # Workouts are listed newest first, so everything from
+                # the watermark onwards is something we've already seen
+                data = res['data']
+                known = cls._watermark_index(data, since)
+                if known is not None:
+                    data = data[:known]
+
+                # Kick off the next page before handing out this one
+                more_pages = known is None and page < res['page_count']
+                if pool is not None and more_pages:
+                    upcoming = pool.submit(
+                        cls._workouts_page, page, results_per_page, client)
+
+                for workout in data:
+                    yield cls._workout(workout, client)
+
+                if not more_pages:
+                    return
+
+                if upcoming is not None:
+                    res, upcoming = upcoming.result(), None
+                else:
+                    res = cls._workouts_page(page, results_per_page, client)
+
+                page += 1
+
+        finally:
+            # We may be stopped part way through (eg: break in the
+            # calling loop), don't leave a page fetch hanging around
+            if upcoming is not None:
+                upcoming.cancel()
+
+            if pool is not None:
+                pool.shutdown(wait=False)
+
+    @classmethod
+    def list_since(cls, since=None, results_per_page=10, client=None):
+        """ Return a list of PelotonWorkout instances for every workout
+            newer than `since` (see iter()), along with the watermark to
+            hand to the next call
+
+        The returned watermark is the id of the newest workout if `since`
+        was a workout id, and its created_at datetime otherwise. If there
+        is nothing new, `since` is handed back untouched
+        """
+
+        workouts = list(cls.iter(results_per_page, since=since,
+                                 client=client))
+        if not workouts:
+            return workouts, since
+
+        if isinstance(since, str):
+            return workouts, workouts[0].id
+
+        return workouts, workouts[0].created_at
+
+    @staticmethod
+    def _watermark_index(data, since):
+        """ Return the index of the first (raw) workout in data that is at
+            or past our watermark, or None if there isn't one
+        """
+
+        if since is None:
+            return None
+
+        # Workout id, stop once we see it
+        if isinstance(since, str):
+            for index, workout in enumerate(data):
+                if workout.get('id') == since:
+                    return index
+
+            return None
+
+        # Otherwise it's a point in time. Naive datetimes are assumed to be
+        # UTC, which is how data_to_db (whose connections are pinned to UTC)
+        # and data_to_parquet store them
+        if isinstance(since, datetime):
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            since = since.timestamp()
+
+        for index, workout in enumerate(data):
+            if workout.get('created_at', 0) <= since:
+                return index
+
+        return None
+
+    @classmethod
+    def prefetch(cls, workouts, fields=("metrics", "leaderboard"),
+                 max_workers=None, every_n=None, summaries_only=None,
+                 client=None):
+        """ Load lazy loaded attributes for many workouts at once, through
+            a bounded thread pool, so that accessing them later never
+            touches the network
+
+        Args:
+            workouts: list of PelotonWorkout instances
+            fields: which lazy loaded data to fetch. "metrics" for
+                    .metrics, "leaderboard" (or "achievements") for
+                    leaderboard stats and achievements
+            max_workers: number of requests to make concurrently.
+                         Defaults to the clients prefetch_workers
+            every_n, summaries_only: see PelotonWorkout.load_metrics
+            client: PelotonAPI instance whose options to use. Defaults to
+                    the one the first workout came from. Each workout is
+                    still loaded through its own client
+
+        Returns a dict of {workout_id: {field: exception}} for every load
+        that failed. Those attributes are left as they were
+        """
+
+        if max_workers is None:
+            if client is None and workouts:
+                client = workouts[0]._client
+            max_workers = (client or PelotonAPI.default()).prefetch_workers
+
+        load_metrics = functools.partial(
+            PelotonWorkout._load_metrics, every_n=every_n,
+            summaries_only=summaries_only)
+
+        loaders = {
+            "metrics": ("metrics", load_metrics),
+            "leaderboard": ("leaderboard_rank", PelotonWorkout._load_details),
+            "achievements": ("achievements", PelotonWorkout._load_details),
+        }
+
+        unknown = set(fields) - set(loaders)
+        if unknown:
+            raise ValueError(
+                "Unknown prefetch field(s): {}".format(", ".join(unknown)))
+
+        # Only fetch what hasn't been loaded yet (and details just once,
+        # even if both leaderboard and achievements were asked for)
+        jobs = OrderedDict()
+        for workout in workouts:
+            for field in fields:
+                attr, loader = loaders[field]
+                if workout._not_loaded(attr):
+                    jobs.setdefault((workout, loader), field)
+
+        errors = {}
+        if not jobs:
+            return errors
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+            futures = {
+                pool.submit(loader, workout): (workout, field)
+                for (workout, loader), field in jobs.items()}
+
+            for future in concurrent.futures.as_completed(futures):
+                workout, field = futures[future]
+                try:
+                    future.result()
+                except Exception as error:
+                    get_logger().warning("Failed to prefetch {} for {}: {}"
+                                         .format(field, workout.id, error))
+                    errors.setdefault(workout.id, {})[field] = error
+
+        return errors
+
+    @staticmethod
+    def _workout(data, client):
+        """ Turn raw workout data into a PelotonWorkout, merging it into the
+            one the client already holds for this workout (if any)
+        """
+        return client.workouts.merge(
+            data.get('id'), PelotonWorkout, client=client, **data)
+
+    @staticmethod
+    def _workouts_page(page, results_per_page, client):
+        """ Fetch a single page of the users workout list (raw json)
+        """
 
-        uri = '/api/user/{}/workouts'.format(cls.user_id)
+        uri = '/api/user/{}/workouts'.format(client.user_id)
         params = {
-            'page': 0,
+            'page': page,
             'limit': results_per_page,
             'joins': 'ride,ride.instructor'
         }
 
-        # Get our first page, which includes number of successive pages
-        res = cls._api_request(uri, params).json()
+        return client._api_request(uri, params).json()
 
-        # Add this pages data to our return list
-        ret = [PelotonWorkout(**workout) for workout in res['data']]
+    @classmethod
+    def _workouts_pages(cls, pages, results_per_page, max_workers, client):
+        """ Fetch several pages of the users workout list through a
+            bounded thread pool, returning them in page order
 
-        # We've got page 0, so start with page 1
-        for i in range(1, res['page_count']):
+        If any page fails, pages that haven't started yet are cancelled,
+        in-flight requests are allowed to finish and the error is raised
+        """
 
-            params['page'] += 1
-            res = cls._api_request(uri, params).json()
-            [ret.append(PelotonWorkout(**workout)) for workout in res['data']]
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+            futures = [
+                pool.submit(cls._workouts_page, page, results_per_page,
+                            client)
+                for page in pages]
 
-        return ret
+            try:
+                return [future.result() for future in futures]
+
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
 
     @classmethod
-    def get(cls, workout_id):
+    def get(cls, workout_id, refresh=False, client=None):
         """ Get workout details by workout_id
+
+        Args:
+            refresh: ignore any cached copy of this workout
         """
 
+        client = client or PelotonAPI.default()
+        memo = client.memo
+        if memo is not None and not refresh:
+            workout = memo.get(workout_id, 'workout')
+            if workout is not None:
+                return workout
+
+        # Once a workout is complete, it isn't going to change
         uri = '/api/workout/{}'.format(workout_id)
-        workout = PelotonAPI._api_request(uri).json()
-        return PelotonWorkout(**workout)
+        params = {
+            'joins': 'ride,ride.instructor'
+        }
+
+        workout = client._cached_api_request(
+            uri, params,
+            permanent=lambda data: data.get('status') == 'COMPLETE',
+            refresh=refresh)
+        workout = cls._workout(workout, client)
+
+        if memo is not None:
+            memo.set(workout_id, 'workout', workout)
+
+        return workout
 
     @classmethod
-    def latest(cls):
+    def latest(cls, client=None):
         """ Returns an instance of PelotonWorkout that represents
             the latest workout
         """
 
+        client = client or PelotonAPI.default()
+
         # We need a user ID to list all workouts. @pelotoncycle, please
         # don't do this :(
-        if cls.user_id is None:
-            cls._create_api_session()
-
-        uri = '/api/user/{}/workouts'.format(cls.user_id)
-        params = {
-            'page': 0,
-            'limit': 1,
-            'joins': 'ride,ride.instructor'
-        }
+        if client.user_id is None:
+            client._ensure_api_session()
 
         # Get our first page, which includes number of successive pages
-        res = cls._api_request(uri, params).json()
+        res = cls._workouts_page(0, 1, client)
 
         # Return our single workout, without having to get a bunch of
         # extra data from the API
-        return PelotonWorkout(**res['data'][0])
+        return cls._workout(res['data'][0], client)
 
 
-class PelotonWorkoutMetricsFactory(PelotonAPI):
+class PelotonWorkoutMetricsFactory:
     """ Class to handle fetching and transformation of metric data
     """
 
     @classmethod
-    def get(cls, workout_id):
+    def get(cls, workout_id, every_n=None, summaries_only=None,
+            complete=False, refresh=False, client=None):
         """ Returns a list of PelotonMetric instances for each metric type
+
+        Args:
+            every_n: resolution of the metrics, one sample every `every_n`
+                     seconds. Defaults to the clients metrics_every_n
+            summaries_only: only load metric summaries (calories, distance
+                            etc), without any time series. Defaults to
+                            the clients metrics_summaries_only
+            complete: whether the workout is known to be complete, in which
+                      case its metrics can be cached forever
+            refresh: ignore any cached copy of these metrics
+            client: PelotonAPI instance to fetch through
         """
 
+        client = client or PelotonAPI.default()
+        if every_n is None:
+            every_n = client.metrics_every_n
+
+        if summaries_only is None:
+            summaries_only = client.metrics_summaries_only
+
+        if summaries_only:
+            every_n = _SUMMARIES_EVERY_N
+
+        memo = client.memo
+        kind = ('metrics', every_n, summaries_only)
+        if memo is not None and not refresh:
+            metrics = memo.get(workout_id, kind)
+            if metrics is not None:
+                return metrics
+
         uri = '/api/workout/{}/performance_graph'.format(workout_id)
         params = {
-            'every_n': 1
+            'every_n': every_n
         }
 
-        res = cls._api_request(uri, params).json()
-        return PelotonWorkoutMetrics(**res)
+        res = client._cached_api_request(
+            uri, params, permanent=complete, refresh=refresh)
+        metrics = PelotonWorkoutMetrics(summaries_only=summaries_only, **res)
+
+        if memo is not None:
+            memo.set(workout_id, kind, metrics)
+
+        return metrics
+
+
+# Set up our response cache and saved session, if they were configured
+if CACHE_PATH:
+    PelotonAPI.cache = PelotonCache(CACHE_PATH)
+
+if SESSION_PATH:
+    PelotonAPI.session_path = SESSION_PATH
+
+_DEFAULT_CLIENT = _PelotonDefaultAPI()
@@ -6,6 +6,8 @@ import dash_core_components as dcc
 import dash_html_components as html
 import plotly.express as px
 import plotly.graph_objects as go
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
 
 import psycopg2
 from psycopg2 import Error
@@ -14,15 +16,22 @@ from psycopg2 import Error
 # import csv
 # import json
 
+import os
+
+from functools import lru_cache
+
+from datetime import date
 from datetime import datetime
+from datetime import timedelta
 # from datetime import timezone
-# from datetime import date
 
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates 
 import pandas as pd
 
 from peloton import PelotonWorkout
+from dashboard_data import prepare
+from dashboard_data import rollups_from_workouts
 
 
 '''
@@ -56,213 +65,301 @@ app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
 
 
-connection = psycopg2.connect(user = "rivkahcarl",
-             password = "",
-             host = "127.0.0.1",
-             port = "5432",
-             database = "peloton")
-cursor = connection.cursor()
-
-load_data_query = "SELECT * FROM public.workouts"
-
-df = pd.read_sql(load_data_query, connection)
-
-# Convert to Pandas dataframe - TODO- It might already be in a df format
-# df = pd.DataFrame(finalData)  
-
-# Create pretty Date column
-df['Date'] = df.apply(lambda row: row.created_at.date(), axis=1)
-
-# Create length of time in minutes
-df['durationMinutes'] = df['durationseconds']/60
-
-
-# Task 1a: Plot Calories by Day
-df2 = df.groupby("Date", as_index=False).calories.sum()
-
-df2['Date'] = pd.to_datetime(df2.Date) #, format='%Y%m%d'
-df2['DateName'] = df2.Date.apply(lambda x: x.strftime('%B %d, %Y'))
-
-df3 = df.groupby(["Date", "fitness_discipline"], as_index=False).calories.sum()
-
-calorieGraph = px.bar(df2, x='Date', y='calories', barmode="group", labels={'calories':'Total Calories'})
-# calorieGraphByFitnessType = px.bar(df2, x='Date', y='calories', barmode="group", labels={'calories':'Total Calories'})
-
-# Task 1a: Plot Calories by Day and Fitness type
-uniquefd = df3['fitness_discipline'].unique()
-
-# calorieGraphByFitnessType = go.Figure()
-
-trace_data = []
-for fittype in uniquefd:
-	subbytype = df3[df3["fitness_discipline"] == fittype]
-	trace = go.Bar(name=fittype, x=subbytype['Date'], y=subbytype['calories'])
-	trace_data.append(trace)
-
-	#calorieGraphByFitnessType.add_trace(go.Bar(name=fittype, x=subbytype['Date'], y=subbytype['calories']))
-
-ftlayout = go.Layout(title="Calories per Day by Fitness Type", barmode="stack")
-
-calorieGraphByFitnessType = go.Figure(trace_data, ftlayout)
-# Change the bar mode
-#calorieGraphByFitnessType.update_layout(barmode='stack')
-
-# Average calories by day during Corona social distancing
-df2['Month'] = df2['DateName'].str.split(" ", n=1, expand=True)[0]
-df2['Year'] = df2['DateName'].str.split(" ", expand=True)[2]
-average_calorie_per_day = df2['calories'].mean()
-
-df3 = df2[(df2['Year'] == '2020') & (df2['Month'].isin(['March', 'April', 'May', 'June', 'July', 'August']))] 
-average_calorie_per_day_corona = df3['calories'].mean()
-
-# Task 2: Number of classes per instructor
-df4 = df.groupby("instructorname", as_index=True).count()[['workoutid']]
-
-# Reset index so instructorName is a column in dataframe
-df4 = df4.reset_index()
-
-df4 = df4.rename(columns={'workoutid':'CountOfClasses'})
-df4 = df4.sort_values(by=['CountOfClasses'], ascending=False)
-
-instructorGraph = px.bar(df4, x='CountOfClasses', y='instructorname', barmode="group", labels={'CountOfClasses':'Number of classes', 'instructorname':'Instructor Name'})
-
-#ax = df4.plot(x='instructorName', y='CountOfClasses', kind='barh') #, orientation='horizontal')
-
-# plt.show()
-
-# Task 3a: Number of classes per day 
-
-df5 = df.groupby("Date", as_index=False).workoutid.count()
-
-df5['Date'] = pd.to_datetime(df5.Date) #, format='%Y%m%d'
-workoutsByDateGraph = px.bar(df5, x='Date', y='workoutid', barmode="group", labels={'calories':'Total Calories', 'workoutid':'Number of Classes'})
-
-
-df6 = df.groupby(["Date", "fitness_discipline"], as_index=False).workoutid.count()
-df6['Date'] = pd.to_datetime(df6.Date) #, format='%Y%m%d'
-
-
-# Task 3b: Number of classes per day and fitness type
-uniquefd = df6['fitness_discipline'].unique()
-
-trace_data = []
-for fittype in uniquefd:
-	subbytype = df6[df6["fitness_discipline"] == fittype]
-	trace = go.Bar(name=fittype, x=subbytype['Date'], y=subbytype['workoutid'])
-	trace_data.append(trace)
-
-ftlayout = go.Layout(title="Number of Workouts per Day by Fitness Type", barmode="stack")
-
-numberWorkoutsByDateFitness = go.Figure(trace_data, ftlayout)
-
-# Task 4: Counts based on Lengths of Classes
-
-df7 = df.groupby("durationMinutes", as_index=False).workoutid.count()
-df7 = df7.rename(columns={"durationMinutes": "Length of Class (Minutes)", "workoutid": "Count of Classes"})
-
-# Number of classes per day and length
-df8 = df.groupby(["Date", "durationMinutes"], as_index=False).workoutid.count()
-# df8 = df8.rename(columns={"durationMinutes": "Length of Class (Minutes)", "workoutid": "Count of Classes"})
-
-df8["durationMinutes"] = df8.durationMinutes.apply(lambda x: str(x))
-uniquelth = df8['durationMinutes'].unique()
-
-
-trace_data = []
-for lentype in uniquelth:
-	subbytype = df8[df8["durationMinutes"] == lentype]
-	trace = go.Bar(name=lentype, x=subbytype['Date'], y=subbytype['workoutid'])
-	trace_data.append(trace)
-
-ftlayout = go.Layout(title="Number of Classes per Day by Length", barmode="stack")
-
-numberClassesByLength = go.Figure(trace_data, ftlayout)
-
-# Task 5: Miles and distance
-
-df9 = df.groupby("Date", as_index=False).distance_miles.sum()
-average_miles_per_day_total = df9['distance_miles'].mean()
-
-# Number of average miles per day running
-df10 = df.groupby(["Date", "fitness_discipline"], as_index=False).distance_miles.sum()
-
-#subset dataframe for running and walking and group by date, sum across miles
-df11 = df10[df10['fitness_discipline'].isin(['running', 'walking'])].groupby("Date", as_index=False).distance_miles.sum()
-average_miles_per_day_run = df11['distance_miles'].mean()
-
-# Number of average miles per day cycling
-
-df12 = df10[df10['fitness_discipline'].isin(['cycling'])].groupby("Date", as_index=False).distance_miles.sum()
-average_miles_per_day_cycling = df12['distance_miles'].mean()
-
-
-# Chart of miles per day broken down by running and cycling
-df13 = df10[df10['distance_miles']!=0]
-uniquefd = df13['fitness_discipline'].unique()
-
-trace_data = []
-for fittype in uniquefd:
-	subbytype = df13[df13["fitness_discipline"] == fittype]
-	trace = go.Bar(name=fittype, x=subbytype['Date'], y=subbytype['distance_miles'])
-	trace_data.append(trace)
-
-ftlayout = go.Layout(title="Miles (Distance) per Day by Fitness Type", barmode="stack")
-
-milesGraph = go.Figure(trace_data, ftlayout)
-
+# Set PELOTON_PARQUET to a directory written by data_to_parquet.py to load workouts from there
+# (straight into Arrow, no database round trip) rather than from Postgres
+PARQUET_PATH = os.environ.get("PELOTON_PARQUET")
+
+# How often (in seconds) the page checks for newly ingested workouts
+REFRESH_SECONDS = 60
+
+
+def connect():
+    return psycopg2.connect(user = "rivkahcarl",
+                 password = "",
+                 host = "127.0.0.1",
+                 port = "5432",
+                 database = "peloton",
+                 # Days are UTC days, as stored (see data_to_db.py)
+                 options = "-c timezone=UTC")
+
+
+def slice_filter(column, start, end, disciplines):
+    """ SQL condition (and its parameters) for rows whose column falls from start to end (dates, inclusive)
+        and in disciplines - None for no limit. Every check is against an indexed column """
+    conditions, params = ["TRUE"], {}
+    if start is not None:
+        conditions.append("%s >= %%(start)s" % column)
+        params['start'] = start
+    if end is not None:
+        conditions.append("%s < %%(after)s" % column)
+        params['after'] = end + timedelta(days=1)
+    if disciplines:
+        conditions.append("fitness_discipline = ANY(%(disciplines)s)")
+        params['disciplines'] = list(disciplines)
+    return " AND ".join(conditions), params
+
+
+def data_range():
+    """ First and last days with workouts, and every fitness type, for the filters """
+    if PARQUET_PATH:
+        from data_to_parquet import load_workouts
+        df = load_workouts(PARQUET_PATH, columns=['created_at', 'fitness_discipline'])
+        if not len(df.index):
+            return None, None, []
+        return df.created_at.min().date(), df.created_at.max().date(), sorted(df.fitness_discipline.unique())
+
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT min(day), max(day) FROM rollup_day_discipline")
+            first_day, last_day = cursor.fetchone()
+            cursor.execute("SELECT DISTINCT fitness_discipline FROM rollup_day_discipline ORDER BY 1")
+            disciplines = [row[0] for row in cursor.fetchall()]
+    finally:
+        connection.close()
+    return first_day, last_day, disciplines
+
+
+def data_version():
+    """ Changes whenever workouts are added (whatever their created_at) or the rollups rebuilt: the
+        rollup revision data_to_db.py bumps along with them, or the export's file listing """
+    if PARQUET_PATH:
+        from data_to_parquet import export_version
+        return export_version(PARQUET_PATH)
+
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT revision FROM ingest_state")
+            return str(cursor.fetchone()[0])
+    finally:
+        connection.close()
+
+
+def load_data(start=None, end=None, disciplines=None):
+    """ The rollups (see dashboard_data.py) for workouts from start to end (dates, inclusive) in disciplines
+        (None for no limit). Only that slice is read and aggregated """
+
+    if PARQUET_PATH:
+        # Aggregate the raw workouts ourselves
+        from data_to_parquet import load_workouts
+        df = load_workouts(PARQUET_PATH,
+                           columns=['created_at', 'fitness_discipline', 'calories', 'instructorname', 'durationseconds', 'distance_miles'],
+                           since=datetime.combine(start, datetime.min.time()) if start is not None else None,
+                           until=datetime.combine(end + timedelta(days=1), datetime.min.time()) if end is not None else None,
+                           disciplines=disciplines)
+        return rollups_from_workouts(df)
+
+    # Everything by day comes pre-aggregated from the rollup tables that data_to_db.py maintains. The
+    # instructor and class length rollups can't be sliced by fitness type (or, for instructors, by day),
+    # so those slices are aggregated from the (indexed) workouts table instead
+    connection = connect()
+    try:
+        condition, params = slice_filter("day", start, end, disciplines)
+        by_day_discipline = pd.read_sql('SELECT day AS "Date", fitness_discipline, workouts, calories, distance_miles '
+                                        'FROM rollup_day_discipline WHERE %s ORDER BY day' % condition, connection, params=params)
+
+        if not disciplines:
+            condition, params = slice_filter("day", start, end, None)
+            by_day_length = pd.read_sql('SELECT day AS "Date", duration_minutes AS "durationMinutes", workouts '
+                                        'FROM rollup_day_length WHERE %s ORDER BY day' % condition, connection, params=params)
+        else:
+            condition, params = slice_filter("created_at", start, end, disciplines)
+            by_day_length = pd.read_sql('SELECT created_at::date AS "Date", (durationSeconds / 60)::double precision AS "durationMinutes", '
+                                        'count(*) AS workouts FROM workouts WHERE %s GROUP BY 1, 2 ORDER BY 1' % condition,
+                                        connection, params=params)
+
+        if start is None and end is None and not disciplines:
+            by_instructor = pd.read_sql('SELECT instructorName, workouts FROM rollup_instructor', connection)
+        else:
+            condition, params = slice_filter("created_at", start, end, disciplines)
+            by_instructor = pd.read_sql('SELECT instructorName, count(*) AS workouts FROM workouts '
+                                        'WHERE %s AND instructorName IS NOT NULL GROUP BY 1' % condition, connection, params=params)
+    finally:
+        connection.close()
+
+    return by_day_discipline, by_day_length, by_instructor
+
+
+def stacked_bars(df, title):
+    """ A stacked bar chart with a bar per column of df (indexed by Date) """
+    trace_data = [go.Bar(name=column, x=df.index, y=df[column]) for column in df.columns]
+    return go.Figure(trace_data, go.Layout(title=title, barmode="stack"))
+
+
+def build_dashboard(data):
+    """ Headline numbers, figures and the class length table, from a DashboardData """
+
+    # Task 1a: Plot Calories by Day
+    calorieGraph = px.bar(x=data.calories_by_day.index, y=data.calories_by_day.values, barmode="group",
+                          labels={'x':'Date', 'y':'Total Calories'})
+
+    # Task 1a: Plot Calories by Day and Fitness type
+    calorieGraphByFitnessType = stacked_bars(data.calories_by_day_discipline, "Calories per Day by Fitness Type")
+
+    # Task 2: Number of classes per instructor
+    instructorGraph = px.bar(x=data.workouts_by_instructor.values, y=data.workouts_by_instructor.index, barmode="group",
+                             labels={'x':'Number of classes', 'y':'Instructor Name'})
+
+    # Task 3a: Number of classes per day 
+    workoutsByDateGraph = px.bar(x=data.workouts_by_day.index, y=data.workouts_by_day.values, barmode="group",
+                                 labels={'x':'Date', 'y':'Number of Classes'})
+
+    # Task 3b: Number of classes per day and fitness type
+    numberWorkoutsByDateFitness = stacked_bars(data.workouts_by_day_discipline, "Number of Workouts per Day by Fitness Type")
+
+    # Task 4: Number of classes per day and length
+    numberClassesByLength = stacked_bars(data.workouts_by_day_length, "Number of Classes per Day by Length")
+
+    # Task 5: Chart of miles per day broken down by running and cycling
+    milesGraph = stacked_bars(data.miles_by_day_discipline, "Miles (Distance) per Day by Fitness Type")
+
+    return ('Total Workouts: %s' % data.total_workouts,
+            'Average Calories Per Day Overall, %s' % data.average_calories_per_day,
+            'Average Calories Per Day during Corona Months, %s' % data.average_calories_per_day_corona,
+            'Average Miles Ran/Walked Per Day, %s' % data.average_miles_per_day_run,
+            'Average Miles Biked Per Day, %s' % data.average_miles_per_day_cycling,
+            calorieGraph,
+            calorieGraphByFitnessType,
+            workoutsByDateGraph,
+            numberWorkoutsByDateFitness,
+            milesGraph,
+            instructorGraph,
+            data.workouts_by_length.to_dict('records'),
+            numberClassesByLength)
+
+
+# Everything below is keyed on the version of the data (see data_version()), so nothing is loaded
+# again until new workouts show up - until then, the same slices come straight out of these
+@lru_cache(maxsize=4)
+def cached_data_range(version):
+    """ data_range(), worked out once per version of the data """
+    return data_range()
+
+
+@lru_cache(maxsize=32)
+def cached_dashboard(version, start, end, disciplines):
+    """ build_dashboard() for a slice (disciplines as a tuple), worked out once per version of the data """
+    return build_dashboard(prepare(*load_data(start, end, disciplines)))
+
+
+# Nothing is loaded up front: the page fills itself in through the callbacks below once it's opened
 app.layout = html.Div(children=[
     html.H1(children='Peloton Workouts: Personal Dashboard'),
     html.Div(children='''
         Aggregate Data across Peloton workouts to monitor personal progress
     '''),
-    html.H3(children='Total Workouts: %s' % len(df.index)),
-    html.H3(children='Average Calories Per Day Overall, %s' % average_calorie_per_day),    
-    html.H3(children='Average Calories Per Day during Corona Months, %s' % average_calorie_per_day_corona),
+    dcc.Interval(id='refresh', interval=REFRESH_SECONDS * 1000),
+    dcc.Store(id='data-version'),
+    # Only the workouts picked here are fetched (and aggregated) for everything below
+    dcc.DatePickerRange(
+        id='date-range'
+    ),
+    dcc.Dropdown(
+        id='fitness-types',
+        multi=True,
+        placeholder='All fitness types'
+    ),
+    html.H3(id='total-workouts'),
+    html.H3(id='average-calories'),
+    html.H3(id='average-calories-corona'),
     # The total average miles per day did not make as much sense without being broken out by fitness type
     # html.H3(children='Average Miles Per Day Across all fitness types, %s' % average_miles_per_day_total),
-    html.H3(children='Average Miles Ran/Walked Per Day, %s' % average_miles_per_day_run),
-    html.H3(children='Average Miles Biked Per Day, %s' % average_miles_per_day_cycling),
+    html.H3(id='average-miles-run'),
+    html.H3(id='average-miles-cycling'),
     dcc.Graph(
-        id='calorie-graph',
-        figure=calorieGraph
+        id='calorie-graph'
     ),
     html.Hr(),
     dcc.Graph(
-    	id='calorie-graph-fitness-type',
-    	figure=calorieGraphByFitnessType
+    	id='calorie-graph-fitness-type'
     ),
     html.Hr(),
     dcc.Graph(
-    	id='count-workouts-by-date',
-    	figure=workoutsByDateGraph
+    	id='count-workouts-by-date'
     ),    
     html.Hr(),
     dcc.Graph(
-    	id='count-workouts-by-date-fitness-type',
-    	figure=numberWorkoutsByDateFitness
+    	id='count-workouts-by-date-fitness-type'
     ),    
     html.Hr(),
     dcc.Graph(
-    	id='miles-graph',
-    	figure=milesGraph
+    	id='miles-graph'
     	),
     html.Hr(),
     dcc.Graph(
-    	id='instructor-graph',
-    	figure=instructorGraph),
+    	id='instructor-graph'),
     html.Hr(),
     dash_table.DataTable(
     				id='length-table',
-    				columns=[{"name": i, "id": i} for i in df7.columns],
-    				data=df7.to_dict('records')
+    				columns=[{"name": i, "id": i} for i in ["Length of Class (Minutes)", "Count of Classes"]]
     				),
     html.Hr(),
     dcc.Graph(
-    	id='classes-by-length-graph',
-    	figure=numberClassesByLength),
+    	id='classes-by-length-graph'),
 ])
 
 
+@app.callback(Output('data-version', 'data'),
+              [Input('refresh', 'n_intervals')],
+              [State('data-version', 'data')])
+def update_data_version(n_intervals, current):
+    # Leave everything else alone unless there's new data
+    version = data_version()
+    if version == current:
+        raise PreventUpdate
+    return version
+
+
+@app.callback(
+    [Output('date-range', 'min_date_allowed'),
+     Output('date-range', 'max_date_allowed'),
+     Output('fitness-types', 'options')],
+    [Input('data-version', 'data')])
+def update_filters(version):
+    if version is None:
+        raise PreventUpdate
+
+    first_day, last_day, disciplines = cached_data_range(version)
+    return first_day, last_day, [{'label': discipline, 'value': discipline} for discipline in disciplines]
+
+
+@app.callback(
+    [Output('total-workouts', 'children'),
+     Output('average-calories', 'children'),
+     Output('average-calories-corona', 'children'),
+     Output('average-miles-run', 'children'),
+     Output('average-miles-cycling', 'children'),
+     Output('calorie-graph', 'figure'),
+     Output('calorie-graph-fitness-type', 'figure'),
+     Output('count-workouts-by-date', 'figure'),
+     Output('count-workouts-by-date-fitness-type', 'figure'),
+     Output('miles-graph', 'figure'),
+     Output('instructor-graph', 'figure'),
+     Output('length-table', 'data'),
+     Output('classes-by-length-graph', 'figure')],
+    [Input('data-version', 'data'),
+     Input('date-range', 'start_date'),
+     Input('date-range', 'end_date'),
+     Input('fitness-types', 'value')])
+def update_dashboard(version, start_date, end_date, disciplines):
+    if version is None:
+        raise PreventUpdate
+
+    start = date.fromisoformat(start_date[:10]) if start_date else None
+    end = date.fromisoformat(end_date[:10]) if end_date else None
+
+    # Reaching either end of what we have means no limit that way (so the rollups can be used as is, and
+    # the same slice is cached however it was picked)
+    first_day, last_day, _ = cached_data_range(version)
+    if start is not None and first_day is not None and start <= first_day:
+        start = None
+    if end is not None and last_day is not None and end >= last_day:
+        end = None
+
+    return cached_dashboard(version, start, end, tuple(sorted(disciplines)) if disciplines else None)
+
+
 
 
 if __name__ == '__main__':
@@ -0,0 +1,65 @@
+'''
+What we keep of each workout, shared by data_to_db.py and data_to_parquet.py (without needing either's
+dependencies)
+'''
+
+# Per-second metrics we store, one column each in workout_metrics
+METRIC_COLUMNS = ['output', 'cadence', 'resistance', 'speed', 'heart_rate']
+
+
+def workout_row(workout):
+    """ Pull out subset of relevant data for dashboard, as a row for the workouts table.
+        Returns None for workouts we don't store """
+
+    if workout.fitness_discipline == 'meditation':
+        return None #Dont care for meditation classes at this point in time- mostly concerned about active fitness
+
+    # Gather Calories
+    # In this library calories are found in the PelotonWorkoutMetrics object
+    # Not all workouts have associated calorie measures
+    if hasattr(workout.metrics, 'calories_summary'):
+        calories = workout.metrics.calories_summary.value if workout.metrics.calories_summary.slug == 'calories' else 0
+    else:
+        print("The following class does not have Calorie object: %s" % workout.id, workout.fitness_discipline)
+        calories = 0 ## TODO - Figure out why and which class is missing calories
+
+    # Gather distance in miles
+    if hasattr(workout.metrics, 'distance_summary'):
+        distance_miles = workout.metrics.distance_summary.value if workout.metrics.distance_summary.unit == 'mi' else 0
+    else:
+        print("The following class does not have distance in miles %s" % workout.id, workout.fitness_discipline)
+        distance_miles = 0
+
+    # Gather Instructors names
+    # Instructor name are found within 'ride.instructor.name' - not all workouts have an associated instructor
+    if hasattr(workout.ride, 'instructor'):
+        instructorName = workout.ride.instructor.name
+    else:
+        print("Workout is missing Instructor information, Id= %s" % workout.id)
+        instructorName = None
+
+    # Gather Duration
+    if hasattr(workout.ride, 'duration'):
+        durationSeconds = workout.ride.duration
+    else:
+        print("Workout is missing duration information, Id= %s" % workout.id)
+        durationSeconds = None
+
+    return (workout.id, workout.fitness_discipline, workout.created_at, calories, instructorName, durationSeconds, distance_miles)
+
+
+def metric_values(metrics):
+    """ A workout's per-second metrics as (seconds, values): an int32 array of time offsets, and a
+        float array with a row for each of them and a column for each of METRIC_COLUMNS. Missing
+        metrics (and any gaps) are NaN """
+
+    import numpy
+
+    seconds = numpy.asarray(getattr(metrics, 'seconds', ()), dtype=numpy.int32)
+    values = numpy.full((len(seconds), len(METRIC_COLUMNS)), numpy.nan)
+    for index, slug in enumerate(METRIC_COLUMNS):
+        if slug in metrics.metric_slugs:
+            column = getattr(metrics, slug).to_numpy()[:len(seconds)]
+            values[:len(column), index] = column
+
+    return seconds, values